@@ -1,19 +1,127 @@
 from fastapi import APIRouter, HTTPException, status
-from typing import List 
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+from typing import List, Optional
+import asyncio
+import json
+import time
 
+from ..config.settings import settings
 from ..models.search import (
+    SearchMode,
     SearchRequest, 
     SearchResponse,
+    BatchSearchRequest,
+    BatchSearchItem,
+    BatchSearchResponse,
+    SearchResult,
     UnifiedSearchResponse,
     AIAnswer,    
+    AnswerJobResponse,
     HealthResponse 
 )
-from ..services.search_service import search_service
+from ..services.search_service import (
+    search_service,
+    ServiceNotReadyError,
+    InvalidCursorError,
+    UnsupportedSearchError,
+    truncate_abstracts
+)
 from ..services.llm_service import get_llm_service
+from ..services.answer_jobs import answer_jobs, AnswerQueueFullError
+from ..services.monitor import health_monitor
 
 
 router = APIRouter()
 
+async def _run_search(request: SearchRequest, fields: Optional[List[str]]):
+    """
+    Run a plain or cursor-paginated search for a request
+
+    Returns:
+        Tuple of (results, search time, next cursor or None)
+    """
+    if request.cursor or request.paginate:
+        return await search_service.search_page(
+            query=request.query.strip(),
+            mode=request.mode,
+            limit=request.limit,
+            alpha=_alpha(request),
+            fields=fields,
+            cursor=request.cursor,
+            fusion=request.fusion,
+            filters=request.search_filters()
+        )
+
+    results, search_time = await search_service.search(
+        query=request.query.strip(),
+        mode=request.mode,
+        limit=request.limit,
+        alpha=_alpha(request),
+        fields=fields,
+        rerank=request.rerank,
+        fusion=request.fusion,
+        filters=request.search_filters()
+    )
+    return results, search_time, None
+
+def _alpha(request: SearchRequest) -> float:
+    """Hybrid weighting for a request (settings default when not given)"""
+    return request.alpha if request.alpha is not None else settings.DEFAULT_ALPHA
+
+def _rag_paper_count(request: SearchRequest) -> int:
+    """Number of top papers to send to the LLM (fewer when reranked)"""
+    if request.rerank and not (request.cursor or request.paginate):
+        return settings.RERANK_RAG_PAPERS
+    return settings.RAG_MAX_PAPERS
+
+def _to_ai_answer(llm_response: dict) -> AIAnswer:
+    """Build the AIAnswer model from an LLM service response dict"""
+    return AIAnswer(
+        answer=llm_response["answer"],
+        model=llm_response["model"],
+        tokens_used=llm_response.get("tokens_used", 0),
+        generation_time=llm_response["generation_time"],
+        error=llm_response.get("error"),
+        cached=llm_response.get("cached", False)
+    )
+
+async def _query_vector(query: str) -> Optional[List[float]]:
+    """Query embedding for the semantic answer cache (None if disabled/unavailable)"""
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None
+    try:
+        # Already in the embedding cache for semantic and hybrid searches
+        return await search_service.get_query_embedding(query)
+    except Exception as e:
+        print(f"Could not get query embedding for semantic cache: {e}")
+        return None
+
+def _project_response(response: BaseModel, request: SearchRequest):
+    """
+    Serialize a search response keeping only the requested paper fields
+
+    Unselected fields are dropped from each result instead of being sent
+    as nulls. Without a field selection the model is returned unchanged.
+    """
+    excluded = _excluded_fields(request)
+    if not excluded:
+        return response
+
+    return Response(
+        content=response.model_dump_json(exclude=excluded),
+        media_type="application/json"
+    )
+
+def _excluded_fields(request: SearchRequest) -> Optional[dict]:
+    """Pydantic exclude spec dropping unselected paper fields from results"""
+    fields = request.field_names()
+    if not fields:
+        return None
+
+    excluded = set(SearchResult.PROPERTY_FIELDS) - set(fields)
+    return {"results": {"__all__": excluded}}
+
 @router.post("/search", response_model=UnifiedSearchResponse)
 async def unified_search(request: SearchRequest):
     """
@@ -29,6 +137,12 @@ async def unified_search(request: SearchRequest):
         -query: Search query string(required)
         -mode: Search mode - hybrid, semantic, or keyword(default: hybrid)
         -limit: Number of results to return (default: 10, max: 100)
+        -fields: Paper fields to return (default: all)
+        -abstract_max_chars: Truncate returned abstracts (optional)
+        -paginate / cursor: Cursor pagination; the AI answer is only
+         generated for the first page
+        -async_answer: Return papers immediately with an answer_job_id;
+         fetch the answer from /api/answers/{id}
     
     Returns:
         list of matching papers with papers, AI answer, and metdata
@@ -41,37 +155,59 @@ async def unified_search(request: SearchRequest):
                 detail="Query cannot be empty"
             )
         
-        #perform search
-        results, search_time = search_service.search(
-            query=request.query.strip(),
-            mode=request.mode,
-            limit=request.limit
+        llm_service = get_llm_service()
+        generate_answer = llm_service is not None and not request.cursor
+        max_papers = _rag_paper_count(request)
+
+        #perform search (the LLM needs full papers, so only project
+        # fields in Weaviate when there is no answer to generate)
+        results, search_time, next_cursor = await _run_search(
+            request,
+            fields=None if generate_answer else request.field_names()
         )
 
         # Generate AI answer using LLM
-        llm_service = get_llm_service()
         ai_answer = None
+        answer_job_id = None
         papers_analyzed = 0
         
-        if llm_service and len(results) > 0:
+        if generate_answer and len(results) > 0 and request.async_answer:
+            # Return the papers now; the answer is generated in the background
+            papers = results[:max_papers]
+            query_vector = await _query_vector(request.query)
             try:
-                print(f"Generating AI answer from top {min(10, len(results))} papers...")
+                answer_job_id = answer_jobs.submit(
+                    lambda: llm_service.generate_answer(
+                        query=request.query.strip(),
+                        papers=papers,
+                        max_papers=max_papers,
+                        query_vector=query_vector
+                    ),
+                    papers_analyzed=len(papers)
+                )
+                papers_analyzed = len(papers)
+            except AnswerQueueFullError as e:
+                ai_answer = AIAnswer(
+                    answer=f"AI answer generation is currently unavailable: {str(e)}",
+                    model="error",
+                    tokens_used=0,
+                    generation_time=0.0,
+                    error=str(e)
+                )
+        elif generate_answer and len(results) > 0:
+            try:
+                print(f"Generating AI answer from top {min(max_papers, len(results))} papers...")
 
-                # Generate anwer from top 5 papers
-                llm_response = llm_service.generate_answer(
+                # Generate anwer from top papers
+                llm_response = await llm_service.generate_answer(
                     query = request.query.strip(),
-                    papers=results[:10],
-                    max_papers=10
+                    papers=results[:max_papers],
+                    max_papers=max_papers,
+                    query_vector=await _query_vector(request.query)
                 )
 
-                ai_answer = AIAnswer(
-                    answer=llm_response["answer"],
-                    model=llm_response["model"],
-                    tokens_used=llm_response.get("tokens_used", 0),
-                    generation_time=llm_response["generation_time"],
-                    error=llm_response.get("error")
-                )
-                papers_analyzed = min(5, len(results))
+                ai_answer = _to_ai_answer(llm_response)
+                papers_analyzed = min(max_papers, len(results))
 
                 print(f"AI answer generated in {llm_response['generation_time']:.2f}s")
                 print(f"  Model: {llm_response['model']}")
@@ -97,17 +233,29 @@ async def unified_search(request: SearchRequest):
         response = UnifiedSearchResponse(
             query=request.query,
             mode=request.mode.value,
-            results=results,
+            results=truncate_abstracts(results, request.abstract_max_chars),
             total_count=len(results),
             search_time=round(search_time, 3),
+            next_cursor=next_cursor,
             ai_answer=ai_answer,
+            answer_job_id=answer_job_id,
             papers_analyzed=papers_analyzed,
             rag_enabled=llm_service is not None 
         )
-        return response
+        return _project_response(response, request)
     
     except HTTPException:
         raise
+    except ServiceNotReadyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except (InvalidCursorError, UnsupportedSearchError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         print(f"Search API error: {e}")
         raise HTTPException(
@@ -115,6 +263,94 @@ async def unified_search(request: SearchRequest):
             detail=f"Search failed: {str(e)}"
         )
     
+@router.post("/search/stream")
+async def streaming_search(request: SearchRequest):
+    """
+    STREAMING RAG SEARCH ENDPOINT (Server-Sent Events)
+
+    Same search as /search, but the response is an event stream:
+    1. 'results' - the retrieved papers, sent as soon as retrieval finishes
+    2. 'token'   - pieces of the AI answer as the LLM generates them
+    3. 'answer'  - the complete AIAnswer (tokens used, generation time)
+    4. 'done'    - end of stream
+    """
+    if not request.query or not request.query.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Query cannot be empty"
+        )
+
+    llm_service = get_llm_service()
+    generate_answer = llm_service is not None and not request.cursor
+    max_papers = _rag_paper_count(request)
+
+    # Retrieval happens before the stream starts so errors get a proper status
+    try:
+        results, search_time, next_cursor = await _run_search(
+            request,
+            fields=None if generate_answer else request.field_names()
+        )
+    except ServiceNotReadyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except (InvalidCursorError, UnsupportedSearchError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        print(f"Search API error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Search failed: {str(e)}"
+        )
+
+    papers = results[:max_papers]
+    response = SearchResponse(
+        results=truncate_abstracts(results, request.abstract_max_chars),
+        total_count=len(results),
+        query=request.query,
+        mode=request.mode.value,
+        search_time=round(search_time, 3),
+        next_cursor=next_cursor
+    )
+
+    async def events():
+        yield _sse("results", {
+            **response.model_dump(exclude=_excluded_fields(request)),
+            "rag_enabled": llm_service is not None
+        })
+
+        if generate_answer and papers:
+            async for event in llm_service.stream_answer(
+                query=request.query.strip(),
+                papers=papers,
+                max_papers=max_papers,
+                query_vector=await _query_vector(request.query)
+            ):
+                if event["type"] == "token":
+                    yield _sse("token", {"content": event["content"]})
+                else:
+                    ai_answer = _to_ai_answer(event)
+                    yield _sse("answer", {
+                        **ai_answer.model_dump(),
+                        "papers_analyzed": len(papers)
+                    })
+
+        yield _sse("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 # LEGACY ENDPOINT -  for backward compatibility
 @router.post("/search/legacy", response_model=SearchResponse)
 async def legacy_search(request: SearchRequest):
@@ -129,22 +365,31 @@ async def legacy_search(request: SearchRequest):
                 detail="Query cannot be empty"
             )
         
-        results, search_time = search_service.search(
-            query=request.query.strip(),
-            mode=request.mode,
-            limit=request.limit
-        )
+        results, search_time, next_cursor = await _run_search(request, fields=request.field_names())
 
         response = SearchResponse(
-            results=results,
+            results=truncate_abstracts(results, request.abstract_max_chars),
             total_count=len(results),
             query=request.query,
             mode=request.mode.value,
-            search_time=round(search_time, 3)   
+            search_time=round(search_time, 3),
+            next_cursor=next_cursor
         )
 
-        return response
+        return _project_response(response, request)
     
+    except HTTPException:
+        raise
+    except ServiceNotReadyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except (InvalidCursorError, UnsupportedSearchError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         print(f"Search API error: {e}")
         raise HTTPException(
@@ -152,22 +397,153 @@ async def legacy_search(request: SearchRequest):
             detail=f"Search failed: {str(e)}"
         )
     
+@router.post("/search/batch", response_model=BatchSearchResponse)
+async def batch_search(batch: BatchSearchRequest):
+    """
+    Batch search endpoint (no RAG) for offline jobs
+
+    All query embeddings are computed with one batched encode call, then the
+    searches run concurrently (at most BATCH_SEARCH_CONCURRENCY at a time).
+    Results are returned in request order, either as one JSON document or,
+    with stream=true, as NDJSON with one line per search. A failing search
+    is reported in its item's error field and doesn't fail the batch.
+    """
+    if len(batch.requests) > settings.BATCH_SEARCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_SEARCH_MAX_QUERIES} searches per batch"
+        )
+
+    start_time = time.time()
+
+    try:
+        await search_service.prefetch_embeddings([
+            request.query for request in batch.requests
+            if request.mode != SearchMode.KEYWORD
+        ])
+    except ServiceNotReadyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except Exception as e:
+        # Searches will encode their own queries
+        print(f"Batch encode failed: {e}")
+
+    semaphore = asyncio.Semaphore(settings.BATCH_SEARCH_CONCURRENCY)
+    tasks = [
+        asyncio.create_task(_batch_item(index, request, semaphore))
+        for index, request in enumerate(batch.requests)
+    ]
+
+    if batch.stream:
+        async def ndjson_lines():
+            try:
+                for task, request in zip(tasks, batch.requests):
+                    item = await task
+                    yield json.dumps(item.model_dump(exclude=_excluded_fields(request))) + "\n"
+            finally:
+                # Client went away - stop the remaining searches
+                for task in tasks:
+                    task.cancel()
+
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    try:
+        items = await asyncio.gather(*tasks)
+    finally:
+        # Request cancelled (client went away) or a search raised - stop the rest
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+    return Response(
+        content=json.dumps({
+            "responses": [
+                item.model_dump(exclude=_excluded_fields(request))
+                for item, request in zip(items, batch.requests)
+            ],
+            "total_count": len(items),
+            "search_time": round(time.time() - start_time, 3)
+        }),
+        media_type="application/json"
+    )
+
+async def _batch_item(index: int, request: SearchRequest, semaphore: asyncio.Semaphore) -> BatchSearchItem:
+    """Run one search of a batch under the concurrency limit"""
+    async with semaphore:
+        try:
+            if not request.query.strip():
+                raise ValueError("Query cannot be empty")
+
+            results, search_time, next_cursor = await _run_search(request, fields=request.field_names())
+            return BatchSearchItem(
+                index=index,
+                results=truncate_abstracts(results, request.abstract_max_chars),
+                total_count=len(results),
+                query=request.query,
+                mode=request.mode.value,
+                search_time=round(search_time, 3),
+                next_cursor=next_cursor
+            )
+        except Exception as e:
+            return BatchSearchItem(
+                index=index,
+                results=[],
+                total_count=0,
+                query=request.query,
+                mode=request.mode.value,
+                error=str(e)
+            )
+
+@router.get("/answers/{job_id}", response_model=AnswerJobResponse)
+async def get_answer(job_id: str, wait: float = 0.0):
+    """
+    Fetch the AI answer of an async_answer search
+
+    Args:
+        -job_id: answer_job_id returned by /search
+        -wait: Seconds to long-poll for the answer (max ANSWER_JOB_MAX_WAIT)
+
+    Returns:
+        Job status ('pending', 'running', 'done' or 'failed') and, once
+        finished, the AI answer
+    """
+    job = await answer_jobs.wait(job_id, min(max(wait, 0.0), settings.ANSWER_JOB_MAX_WAIT))
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Answer job not found or expired"
+        )
+
+    return AnswerJobResponse(
+        job_id=job.id,
+        status=job.status,
+        ai_answer=_to_ai_answer(job.result) if job.result else None,
+        papers_analyzed=job.papers_analyzed,
+        error=job.error
+    )
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """
-    Health check endpoint
-    Returns API, weaviate, and LLM connection status
+    Health check endpoint (liveness)
+    Returns API, weaviate, and LLM connection status plus readiness.
+    Served from the background monitor's snapshot (see snapshot_age), so it
+    never probes a backend and always answers immediately.
     """
-    weaviate_connected = search_service.is_connected()
-    llm_service = get_llm_service()
-    llm_connected = llm_service is not None
+    snapshot = health_monitor.snapshot or {}
+    weaviate_connected = snapshot.get("weaviate_connected", False)
+    llm_connected = snapshot.get("llm_connected", False)
+    total_docs = snapshot.get("total_documents", 0)
+    ready = search_service.is_ready
 
-    if weaviate_connected and llm_connected:
-        total_docs = search_service.get_total_documents()
+    if not ready:
+        message = search_service.startup_error or "API is starting. Embedding model or Weaviate not ready yet"
+        status_text = "starting"
+    elif weaviate_connected and llm_connected:
         message = f"API is healthy. {total_docs} documents indexed. RAG enabled"
         status_text = "healthy"
     elif weaviate_connected and not llm_connected:
-        total_docs = search_service.get_total_documents()
         message = f"API is running. {total_docs} documents indexed. RAG disabled(LLM not available)"
         status_text = "degraded"
     else:
@@ -178,25 +554,52 @@ async def health_check():
         status=status_text,
         weaviate_connected=weaviate_connected,
         llm_connected=llm_connected,
+        ready=ready,
+        encoder_ready=search_service.encoder_ready,
+        startup_error=search_service.startup_error,
+        snapshot_age=health_monitor.snapshot_age,
         message=message
     )
 
+@router.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe
+    Returns 200 once the encoder is warm and Weaviate is connected, 503 before
+    """
+    if not search_service.is_ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=search_service.startup_error or "Search service is warming up"
+        )
+    return {"ready": True}
+
 @router.get("/stats")
 async def get_status():
     """
     Get search engine statistics
-    Returns total document count and collection info
+    Returns total document count (from the health monitor snapshot, see
+    snapshot_age) and collection info
     """
     try:
-        total_docs = search_service.get_total_documents()
-        llm_service = get_llm_service
+        snapshot = health_monitor.snapshot or {}
+        llm_service = get_llm_service()
 
         return {
-            "total_documents": total_docs,
-            "collection_name": "MedicalPaper",
+            "total_documents": snapshot.get("total_documents", 0),
+            "snapshot_age": health_monitor.snapshot_age,
+            "collection_name": settings.COLLECTION_NAME,
+            "vector_backend": search_service.backend.name,
             "Status": "active",
             "rag_enabled": llm_service is not None,
-            "llm_model": llm_service.model if llm_service else None
+            "llm_model": llm_service.model if llm_service else None,
+            "cache": search_service.get_cache_stats(),
+            "encoder": search_service.get_encoder_stats(),
+            "reranker": search_service.reranker.stats(),
+            "answer_cache": llm_service.answer_cache.stats() if llm_service else None,
+            "semantic_answer_cache": llm_service.semantic_cache.stats() if llm_service else None,
+            "llm_client": llm_service.llm_client.stats() if llm_service else None,
+            "answer_jobs": answer_jobs.stats()
         }
     
     except Exception as e:
@@ -0,0 +1,69 @@
+# Run from the backend directory: python -m src.benchmark_vector_backends [rounds]
+#
+# Compares near_vector latency of the embedded index against Weaviate for
+# the same query embeddings, and how many of Weaviate's top-k PMIDs the
+# (exact, brute-force) embedded engine also returns.
+import asyncio
+import sys
+import time
+
+from .config.settings import settings
+from .services.encoders import load_encoder, PARITY_SENTENCES
+from .services.vector_backends import WeaviateBackend, EmbeddedBackend
+
+LIMIT = 10
+
+
+async def time_backend(backend, vectors, rounds):
+    """Return (latencies in ms, top-k PMIDs per query) for one backend"""
+    await backend.near_vector(vectors[0], LIMIT, fields=["pmid"])  # warm-up
+
+    latencies = []
+    top_pmids = []
+    for _ in range(rounds):
+        top_pmids = []
+        for vector in vectors:
+            start_time = time.perf_counter()
+            hits = await backend.near_vector(vector, LIMIT, fields=["pmid"])
+            latencies.append((time.perf_counter() - start_time) * 1000)
+            top_pmids.append([hit.properties.get("pmid") for hit in hits])
+    return latencies, top_pmids
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def main(rounds):
+    model = load_encoder()
+    vectors = model.encode(PARITY_SENTENCES).tolist()
+
+    backends = [EmbeddedBackend(settings.EMBEDDED_INDEX_DIR), WeaviateBackend()]
+    results = {}
+    for backend in backends:
+        try:
+            await backend.connect()
+            results[backend.name] = await time_backend(backend, vectors, rounds)
+        except Exception as e:
+            print(f"{backend.name}: unavailable ({e})")
+        finally:
+            await backend.close()
+
+    print("="*70)
+    print(f"near_vector top-{LIMIT}, {len(vectors)} queries x {rounds} rounds")
+    for name, (latencies, _) in results.items():
+        print(f"{name:>9}: mean {sum(latencies) / len(latencies):.2f} ms  "
+              f"p50 {percentile(latencies, 0.5):.2f} ms  p95 {percentile(latencies, 0.95):.2f} ms")
+
+    if len(results) == 2:
+        overlaps = [
+            len(set(embedded) & set(weaviate)) / max(len(weaviate), 1)
+            for embedded, weaviate in zip(results["embedded"][1], results["weaviate"][1])
+        ]
+        print(f"Top-{LIMIT} overlap with Weaviate: {sum(overlaps) / len(overlaps):.3f}")
+    print("="*70)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,107 @@
+# Run from the backend directory: python -m src.build_embedded_index [options]
+#
+# Builds the memory-mapped index used by VECTOR_BACKEND=embedded, either by
+# exporting the MedicalPaper collection from Weaviate (stored vectors, no
+# re-embedding) or by encoding a collected papers JSON file directly (no
+# Weaviate needed, e.g. for CI). Running API servers pick up the new
+# generation on their next index generation check.
+import argparse
+import time
+
+from tqdm import tqdm
+
+from .config.settings import settings
+from .services.corpus import iter_papers, batched
+from .services.embedded_index import write_index
+from .services.paper_schema import paper_properties, paper_uuid
+
+PROPERTIES = ["title", "abstract", "pmid", "journal", "year", "year_int"]
+EMBEDDING_BATCH_SIZE = 64
+
+
+def export_from_weaviate():
+    """Yield (uuid, properties, vector) for every paper in Weaviate (cursor iteration)"""
+    import weaviate
+
+    with weaviate.connect_to_local(
+        host=settings.WEAVIATE_HOST,
+        port=settings.WEAVIATE_PORT,
+        grpc_port=settings.WEAVIATE_GRPC_PORT
+    ) as client:
+        collection = client.collections.get(settings.COLLECTION_NAME)
+        total = collection.aggregate.over_all(total_count=True).total_count
+
+        for obj in tqdm(collection.iterator(include_vector=True), total=total, desc="Exporting"):
+            vector = obj.vector.get("default") if isinstance(obj.vector, dict) else obj.vector
+            props = {name: obj.properties.get(name) for name in PROPERTIES}
+            yield str(obj.uuid), props, vector
+
+
+def encode_from_file(filename, processes=0):
+    """
+    Yield (uuid, properties, vector) for papers in a collected JSON file
+
+    Args:
+        filename: Collected papers JSON / JSONL file
+        processes: Encoder processes (0 = encode in this process)
+    """
+    if processes > 0:
+        from .services.encode_pool import EncodePool
+        pool = EncodePool(
+            workers=processes,
+            torch_threads=settings.ENCODE_TORCH_THREADS,
+            batch_size=EMBEDDING_BATCH_SIZE
+        )
+        encode = pool.encode
+        # Enough texts per call to give every process whole batches
+        batch_size = EMBEDDING_BATCH_SIZE * processes * 4
+    else:
+        from .services.encoders import load_encoder
+        pool = None
+        model = load_encoder()
+        encode = model.encode
+        batch_size = EMBEDDING_BATCH_SIZE
+
+    papers = (paper for paper in iter_papers(filename) if paper.get("pmid"))
+
+    try:
+        with tqdm(desc="Encoding", unit=" papers") as pbar:
+            for batch in batched(papers, batch_size):
+                vectors = encode([f"{paper['title']} {paper['abstract']}" for paper in batch])
+                for paper, vector in zip(batch, vectors):
+                    yield paper_uuid(paper["pmid"]), paper_properties(paper), vector
+                pbar.update(len(batch))
+    finally:
+        if pool is not None:
+            pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the embedded vector index")
+    parser.add_argument("--from-json", help="Encode papers from this JSON file instead of exporting Weaviate")
+    parser.add_argument("--out", default=settings.EMBEDDED_INDEX_DIR, help="Index directory")
+    parser.add_argument("--dtype", default=settings.EMBEDDED_INDEX_DTYPE, choices=["float16", "float32"])
+    parser.add_argument("--dimension", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--processes", type=int, default=settings.ENCODE_PROCESSES,
+                        help="Encoder processes for --from-json (0 = in-process)")
+    args = parser.parse_args()
+
+    records = encode_from_file(args.from_json, args.processes) if args.from_json else export_from_weaviate()
+
+    start_time = time.time()
+    manifest = write_index(
+        args.out,
+        records,
+        dimension=args.dimension,
+        dtype=args.dtype,
+        model=settings.EMBEDDING_MODEL
+    )
+
+    print("="*70)
+    print(f"Embedded index generation {manifest['generation']} written to {args.out}")
+    print(f"Papers: {manifest['count']:,}  dtype: {manifest['dtype']}  time: {time.time() - start_time:.1f}s")
+    print("="*70)
+
+
+if __name__ == "__main__":
+    main()
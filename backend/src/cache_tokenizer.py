@@ -0,0 +1,42 @@
+# Run from the backend directory: python -m src.cache_tokenizer [encoding]
+#
+# Downloads the tiktoken encoding used for prompt context packing into
+# TOKENIZER_CACHE_DIR. Run it when building the image / deploying: the API
+# only reads the cached file and never fetches it at runtime (without it,
+# tokens are estimated from text length).
+import os
+import sys
+
+from .config.settings import settings
+from .services.context_builder import TokenCounter, cached_encoding_path
+
+
+def main(encoding_name):
+    path = cached_encoding_path(encoding_name, settings.TOKENIZER_CACHE_DIR)
+    if path is None:
+        print(f"Unknown encoding '{encoding_name}'")
+        sys.exit(1)
+
+    if os.path.exists(path):
+        print(f"'{encoding_name}' already cached at {path}")
+        return
+
+    print(f"Downloading '{encoding_name}' to {settings.TOKENIZER_CACHE_DIR}...")
+    os.makedirs(settings.TOKENIZER_CACHE_DIR, exist_ok=True)
+    os.environ["TIKTOKEN_CACHE_DIR"] = settings.TOKENIZER_CACHE_DIR
+    try:
+        import tiktoken
+
+        tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        print(f"Download failed: {e}")
+        sys.exit(1)
+
+    if not TokenCounter(encoding_name, settings.TOKENIZER_CACHE_DIR).load():
+        print("Download finished but the cached file was not found")
+        sys.exit(1)
+    print(f"Cached at {path}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else settings.CONTEXT_TOKENIZER)
@@ -7,10 +7,24 @@ load_dotenv()
 class Settings:
     """Application settings """
 
+    # Vector backend: weaviate, or embedded (in-process mmap index, vector search only)
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "weaviate")
+    EMBEDDED_INDEX_DIR: str = os.getenv("EMBEDDED_INDEX_DIR", "data/embedded_index")
+    EMBEDDED_INDEX_DTYPE: str = os.getenv("EMBEDDED_INDEX_DTYPE", "float16") # used when building
+    EMBEDDED_SEARCH_WORKERS: int = int(os.getenv("EMBEDDED_SEARCH_WORKERS", 2))
+
     # Weaviate settings
     WEAVIATE_HOST: str = os.getenv("WEAVIATE_HOST", "localhost")
     WEAVIATE_PORT: int = int(os.getenv("WEAVIATE_PORT", "8080"))
     WEAVIATE_GRPC_PORT: int = int(os.getenv("WEAVIATE_GRPC_PORT", 50051))
+    # Seconds between background reconnect attempts while Weaviate is down
+    WEAVIATE_CONNECT_RETRY_INTERVAL: float = float(os.getenv("WEAVIATE_CONNECT_RETRY_INTERVAL", 5))
+    # Upper bound (seconds) on each live probe of the health monitor
+    HEALTH_CHECK_TIMEOUT: float = float(os.getenv("HEALTH_CHECK_TIMEOUT", 2))
+    # Seconds between background health refreshes
+    HEALTH_MONITOR_INTERVAL: float = float(os.getenv("HEALTH_MONITOR_INTERVAL", 10))
+    # Also check the Groq API is reachable (lists models, uses no tokens)
+    HEALTH_MONITOR_PROBE_LLM: bool = os.getenv("HEALTH_MONITOR_PROBE_LLM", "True").lower() == "true"
 
     #Application Settings
     ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
@@ -34,12 +48,106 @@ class Settings:
     GROQ_MODEL: str = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
     GROQ_MAX_TOKENS: int = int(os.getenv("GROQ_MAX_TOKENS", 2000))
     GROQ_TEMPERATURE: float = float(os.getenv("GROQ_TEMPERATURE", 0.3))
+    # LLM answer cache settings
+    ANSWER_CACHE_SIZE: int = int(os.getenv("ANSWER_CACHE_SIZE", 2000))
+    ANSWER_CACHE_TTL: float = float(os.getenv("ANSWER_CACHE_TTL", 3600))
+
+    # Semantic answer cache (near-duplicate questions)
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "True").lower() == "true"
+    SEMANTIC_CACHE_SIZE: int = int(os.getenv("SEMANTIC_CACHE_SIZE", 5000))
+    SEMANTIC_CACHE_TTL: float = float(os.getenv("SEMANTIC_CACHE_TTL", 3600))
+    SEMANTIC_CACHE_MIN_SIMILARITY: float = float(os.getenv("SEMANTIC_CACHE_MIN_SIMILARITY", 0.92))
+    SEMANTIC_CACHE_MIN_OVERLAP: float = float(os.getenv("SEMANTIC_CACHE_MIN_OVERLAP", 0.6))
+
+    # Number of top papers sent to the LLM as context
+    RAG_MAX_PAPERS: int = int(os.getenv("RAG_MAX_PAPERS", 10))
+    # LLM client: concurrency cap, deadline, retries and hedging
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", 30))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", 2))
+    LLM_RETRY_BASE_DELAY: float = float(os.getenv("LLM_RETRY_BASE_DELAY", 0.5))
+    LLM_HEDGE_ENABLED: bool = os.getenv("LLM_HEDGE_ENABLED", "False").lower() == "true"
+    LLM_HEDGE_DELAY: float = float(os.getenv("LLM_HEDGE_DELAY", 0)) # 0 = observed p95 latency
+    # Prompt context packing (tokens counted with a local tokenizer)
+    CONTEXT_TOKEN_BUDGET: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", 1500))
+    CONTEXT_MIN_TOKENS_PER_PAPER: int = int(os.getenv("CONTEXT_MIN_TOKENS_PER_PAPER", 40))
+    CONTEXT_TOKENIZER: str = os.getenv("CONTEXT_TOKENIZER", "cl100k_base")
+    # Pre-cached tokenizer files (python -m src.cache_tokenizer); never fetched at runtime
+    TOKENIZER_CACHE_DIR: str = os.getenv("TOKENIZER_CACHE_DIR", "data/tiktoken")
+    # Background answer jobs (async_answer searches)
+    ANSWER_JOB_WORKERS: int = int(os.getenv("ANSWER_JOB_WORKERS", 4))
+    ANSWER_JOB_QUEUE_SIZE: int = int(os.getenv("ANSWER_JOB_QUEUE_SIZE", 200))
+    ANSWER_JOB_MAX_JOBS: int = int(os.getenv("ANSWER_JOB_MAX_JOBS", 2000))
+    ANSWER_JOB_TTL: float = float(os.getenv("ANSWER_JOB_TTL", 600))
+    ANSWER_JOB_MAX_WAIT: float = float(os.getenv("ANSWER_JOB_MAX_WAIT", 30))
+    # Send a live test completion when the LLM service starts
+    LLM_STARTUP_CHECK: bool = os.getenv("LLM_STARTUP_CHECK", "False").lower() == "true"
     
 
     # Search settings
     DEFAULT_SEARCH_LIMIT = 10
     MAX_SEARCH_LIMIT = 100
-    DEFAULT_ALPHA = 0.7 # Hybrid search alpha (0.7 = 70% semantic)
+    DEFAULT_ALPHA: float = float(os.getenv("DEFAULT_ALPHA", 0.7)) # Hybrid search alpha (0.7 = 70% semantic)
+    # Hybrid fusion: relative_score or rrf (fused here from concurrent bm25
+    # and near_vector queries), or server (Weaviate's hybrid query)
+    HYBRID_FUSION: str = os.getenv("HYBRID_FUSION", "relative_score")
+    RRF_K: int = int(os.getenv("RRF_K", 60))
+    # Candidates fetched per leg before fusing
+    FUSION_LEG_CANDIDATES: int = int(os.getenv("FUSION_LEG_CANDIDATES", 50))
+
+    # Embedding model settings
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    ENCODER_BACKEND: str = os.getenv("ENCODER_BACKEND", "torch") # torch, onnx (requirements-onnx.txt) or int8
+    ONNX_MODEL_FILE: str = os.getenv("ONNX_MODEL_FILE", "") # optional file inside the model repo
+    ENCODER_PARITY_CHECK: bool = os.getenv("ENCODER_PARITY_CHECK", "False").lower() == "true"
+
+    # Query embedding cache settings
+    EMBEDDING_CACHE_SIZE: int = int(os.getenv("EMBEDDING_CACHE_SIZE", 10000))
+    EMBEDDING_CACHE_TTL: float = float(os.getenv("EMBEDDING_CACHE_TTL", 3600))
+
+    # Number of threads that run the (CPU-bound) embedding model
+    ENCODER_WORKERS: int = int(os.getenv("ENCODER_WORKERS", 2))
+
+    # Ingestion pipeline (upload scripts): encode threads and batches
+    # buffered between the read -> encode -> upload stages
+    INGEST_ENCODE_WORKERS: int = int(os.getenv("INGEST_ENCODE_WORKERS", 2))
+    INGEST_QUEUE_SIZE: int = int(os.getenv("INGEST_QUEUE_SIZE", 4))
+    # Multi-process encoding for bulk uploads (0 = encode in the uploader
+    # process) and torch threads per encoder process (0 = cores / processes)
+    ENCODE_PROCESSES: int = int(os.getenv("ENCODE_PROCESSES", 0))
+    ENCODE_TORCH_THREADS: int = int(os.getenv("ENCODE_TORCH_THREADS", 0))
+
+    # Micro-batching of concurrent query encodes
+    ENCODE_BATCH_MAX_SIZE: int = int(os.getenv("ENCODE_BATCH_MAX_SIZE", 32))
+    ENCODE_BATCH_MAX_WAIT_MS: float = float(os.getenv("ENCODE_BATCH_MAX_WAIT_MS", 3))
+
+    # Optional cross-encoder rerank stage (SearchRequest.rerank)
+    RERANK_MODEL: str = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    RERANK_CANDIDATES: int = int(os.getenv("RERANK_CANDIDATES", 50))
+    RERANK_BATCH_SIZE: int = int(os.getenv("RERANK_BATCH_SIZE", 16))
+    RERANK_MAX_LENGTH: int = int(os.getenv("RERANK_MAX_LENGTH", 256))
+    RERANK_LATENCY_BUDGET_MS: float = float(os.getenv("RERANK_LATENCY_BUDGET_MS", 300))
+    RERANK_PRELOAD: bool = os.getenv("RERANK_PRELOAD", "False").lower() == "true"
+    # Papers sent to the LLM when results were reranked (top-k is more precise)
+    RERANK_RAG_PAPERS: int = int(os.getenv("RERANK_RAG_PAPERS", 5))
+
+    # Search result cache settings
+    RESULT_CACHE_SIZE: int = int(os.getenv("RESULT_CACHE_SIZE", 5000))
+    RESULT_CACHE_TTL: float = float(os.getenv("RESULT_CACHE_TTL", 300))
+    # Per-leg (bm25 / near_vector) result cache, shared across search modes
+    LEG_CACHE_SIZE: int = int(os.getenv("LEG_CACHE_SIZE", 5000))
+    LEG_CACHE_TTL: float = float(os.getenv("LEG_CACHE_TTL", 300))
+    # Batch search endpoint
+    BATCH_SEARCH_MAX_QUERIES: int = int(os.getenv("BATCH_SEARCH_MAX_QUERIES", 1000))
+    BATCH_SEARCH_CONCURRENCY: int = int(os.getenv("BATCH_SEARCH_CONCURRENCY", 16))
+
+    # Cursor pagination: candidates kept per query and how long cursors live
+    PAGINATION_MAX_CANDIDATES: int = int(os.getenv("PAGINATION_MAX_CANDIDATES", 1000))
+    PAGINATION_CURSOR_TTL: float = float(os.getenv("PAGINATION_CURSOR_TTL", 600))
+    PAGINATION_MAX_SESSIONS: int = int(os.getenv("PAGINATION_MAX_SESSIONS", 500))
+
+    # How often (seconds) the index generation counter is re-read
+    INDEX_GENERATION_CHECK_INTERVAL: float = float(os.getenv("INDEX_GENERATION_CHECK_INTERVAL", 5))
 
     # Collection name
     COLLECTION_NAME = "MedicalPaper"
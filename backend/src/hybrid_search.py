@@ -58,7 +58,8 @@ class MedicalSearchEngine:
 
         filters = None
         if year_from:
-            filters = Filter.by_property("year").greater_or_equal(str(year_from))
+            # year_int is range-indexed; the TEXT year compares as strings
+            filters = Filter.by_property("year_int").greater_or_equal(int(year_from))
         
         response = self.collection.query.hybrid(
             query=query,
@@ -1,34 +1,23 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 
 from .config.settings import settings
 from .api.routes import router
 from .services.search_service import search_service
 from .services.llm_service import initialize_llm_service
+from .services.answer_jobs import answer_jobs
+from .services.monitor import health_monitor
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Lifespan events - startup and shutdown"""
-    # startup
-    print("Starting semantic search API...")
-    print(f"Environment: {settings.ENVIRONMENT}")
-    print(f"Weaviate: {settings.WEAVIATE_HOST}:{settings.WEAVIATE_PORT}")
-
-    # Check Weaviate connection
-    if search_service.is_connected():
-        total_docs = search_service.get_total_documents()
-        print(f"Connected to weaviate -{total_docs} documents indexed")
-    else:
-        print("Warning: Weavaite connection failed")
-    
-    # Initialize LLM service
-    print("\n" + "="*50)
+async def _start_llm_service():
+    """Initialize the LLM service without blocking startup"""
     print("Initializing LLM service for RAG...")
-    print("="*50)
-    llm_service = initialize_llm_service()
+    llm_service = await initialize_llm_service()
 
     if llm_service:
+        # Cached answers depend on the indexed papers
+        search_service.add_invalidation_listener(llm_service.clear_caches)
         print("LLM service initializsed successfully")
         print(f"Model: {llm_service.model}")
         print("RAG capabilities: ENABLED")
@@ -36,13 +25,39 @@ async def lifespan(app: FastAPI):
         print("LLM Service initialzation failed")
         print("RAG capabilities: DISABLED")
         print("System will work in search-only mode")
-    print("="*50 + "\n")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Lifespan events - startup and shutdown"""
+    # startup
+    print("Starting semantic search API...")
+    print(f"Environment: {settings.ENVIRONMENT}")
+    if settings.VECTOR_BACKEND == "embedded":
+        print(f"Vector backend: embedded index at {settings.EMBEDDED_INDEX_DIR}")
+    else:
+        print(f"Weaviate: {settings.WEAVIATE_HOST}:{settings.WEAVIATE_PORT}")
+
+    # Load the encoder and connect to Weaviate in the background so the
+    # app starts serving (health checks) immediately
+    search_service.start()
+
+    # Initialize LLM service in the background as well
+    llm_task = asyncio.create_task(_start_llm_service())
+
+    # Worker pool for async_answer searches
+    answer_jobs.start()
+
+    # Background health/stats snapshot
+    health_monitor.start()
 
     yield
 
     # Shutdown
     print("Shutting down semantic search API...")
-    search_service.close()
+    llm_task.cancel()
+    await answer_jobs.close()
+    await health_monitor.close()
+    await search_service.close()
 
 # Create FastAPI app
 app = FastAPI(
@@ -0,0 +1,83 @@
+# Run from the backend directory: python -m src.migrate_paper_uuids
+#
+# Moves papers uploaded with random ids to their deterministic id
+# (paper_uuid(pmid)), so later uploads upsert them instead of adding
+# duplicates. Objects are read with a cursor (no offset scans) and
+# re-added with their existing vectors, so nothing is re-embedded; the old
+# objects are deleted once all copies were written. Papers with the same
+# PMID collapse into one object. Safe to re-run.
+import weaviate
+from weaviate.classes.query import Filter
+from tqdm import tqdm
+
+from .config.settings import settings
+from .services.index_state import bump_index_generation
+from .services.paper_schema import paper_uuid
+
+PAGE_SIZE = 1000
+DELETE_BATCH_SIZE = 1000
+
+
+def copy_to_deterministic_ids(collection):
+    """
+    Re-add every paper stored under a random id under paper_uuid(pmid)
+
+    Returns:
+        (ids of the old objects, papers without a PMID, failed writes)
+    """
+    old_ids = []
+    without_pmid = 0
+
+    with collection.batch.dynamic() as batch:
+        for obj in tqdm(collection.iterator(include_vector=True, cache_size=PAGE_SIZE), desc="Copying papers"):
+            pmid = obj.properties.get("pmid")
+            if not pmid:
+                without_pmid += 1
+                continue
+
+            uuid = paper_uuid(pmid)
+            if str(obj.uuid) == uuid:
+                continue
+
+            vector = obj.vector.get("default") if isinstance(obj.vector, dict) else obj.vector
+            batch.add_object(uuid=uuid, properties=obj.properties, vector=vector)
+            old_ids.append(str(obj.uuid))
+
+    failed = len(collection.batch.failed_objects)
+    return old_ids, without_pmid, failed
+
+
+def delete_objects(collection, ids):
+    """Delete objects by id, DELETE_BATCH_SIZE ids per request"""
+    deleted = 0
+    for start in tqdm(range(0, len(ids), DELETE_BATCH_SIZE), desc="Deleting old ids"):
+        chunk = ids[start:start + DELETE_BATCH_SIZE]
+        result = collection.data.delete_many(where=Filter.by_id().contains_any(chunk))
+        deleted += result.successful
+    return deleted
+
+
+def main():
+    with weaviate.connect_to_local() as client:
+        collection = client.collections.get(settings.COLLECTION_NAME)
+
+        old_ids, without_pmid, failed = copy_to_deterministic_ids(collection)
+        print(f"Papers moved to deterministic ids: {len(old_ids):,}")
+        print(f"Without a PMID (left as they are): {without_pmid:,}")
+        print(f"Failed: {failed:,}")
+
+        if failed:
+            # Keep the originals so no paper is lost; re-run to retry
+            print("Some copies failed - old objects were kept, re-run the migration")
+            return
+
+        if old_ids:
+            deleted = delete_objects(collection, old_ids)
+            print(f"Deleted old objects: {deleted:,}")
+
+            generation = bump_index_generation(client, settings.COLLECTION_NAME)
+            print(f"Index generation bumped to {generation}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Run from the backend directory: python -m src.migrate_year_int
+#
+# Adds the range-indexed integer year property to an existing MedicalPaper
+# collection and backfills it from the TEXT year. Objects are read with a
+# cursor (no offset scans) and rewritten in batches with their existing
+# vectors, so nothing is re-embedded. Safe to re-run: objects that already
+# have year_int are skipped.
+import weaviate
+from tqdm import tqdm
+
+from .config.settings import settings
+from .services.index_state import bump_index_generation
+from .services.paper_schema import YEAR_INT_PROPERTY, parse_year, ensure_year_int_property
+
+PAGE_SIZE = 1000
+
+
+def backfill_year_int(collection):
+    """Set year_int on every object that has a parseable year but no year_int"""
+    updated = 0
+    unparseable = 0
+
+    with collection.batch.dynamic() as batch:
+        for obj in tqdm(collection.iterator(include_vector=True, cache_size=PAGE_SIZE), desc="Backfilling year_int"):
+            props = obj.properties
+            if props.get(YEAR_INT_PROPERTY) is not None:
+                continue
+
+            year = parse_year(props.get("year"))
+            if year is None:
+                unparseable += 1
+                continue
+
+            vector = obj.vector.get("default") if isinstance(obj.vector, dict) else obj.vector
+            # Batch writes replace whole objects, so send the vector back too
+            batch.add_object(
+                uuid=obj.uuid,
+                properties={**props, YEAR_INT_PROPERTY: year},
+                vector=vector
+            )
+            updated += 1
+
+    failed = len(collection.batch.failed_objects)
+    return updated, unparseable, failed
+
+
+def main():
+    with weaviate.connect_to_local() as client:
+        collection = client.collections.get(settings.COLLECTION_NAME)
+
+        if ensure_year_int_property(collection):
+            print(f"Added {YEAR_INT_PROPERTY} property to {settings.COLLECTION_NAME}")
+        else:
+            print(f"{YEAR_INT_PROPERTY} property already exists")
+
+        updated, unparseable, failed = backfill_year_int(collection)
+
+        print(f"Updated: {updated:,}")
+        print(f"Without a usable year: {unparseable:,}")
+        print(f"Failed: {failed:,}")
+
+        if updated:
+            generation = bump_index_generation(client, settings.COLLECTION_NAME)
+            print(f"Index generation bumped to {generation}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import ClassVar, List, Optional
 from enum import Enum
 
 class SearchMode(str, Enum):
@@ -8,11 +8,94 @@ class SearchMode(str, Enum):
     SEMANTIC = "semantic"
     KEYWORD = "keyword"
 
+class FusionMethod(str, Enum):
+    """How hybrid search combines the keyword and vector results"""
+    RELATIVE_SCORE = "relative_score"
+    RRF = "rrf"
+    SERVER = "server"
+
+class ResultField(str, Enum):
+    """Paper fields that can be selected in a search request"""
+    TITLE = "title"
+    ABSTRACT = "abstract"
+    PMID = "pmid"
+    JOURNAL = "journal"
+    YEAR = "year"
+
+class SearchFilters(BaseModel):
+    """Metadata filters pushed down into Weaviate (hashable, used in cache keys)"""
+    model_config = ConfigDict(frozen=True)
+
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    journal: Optional[str] = None
+
 class SearchRequest(BaseModel):
     """Search request model"""
     query: str = Field(..., min_length=1, max_length=500, description="search_query")
     mode: SearchMode = Field(SearchMode.HYBRID, description="search_mode")
     limit: int = Field(default=10, ge=1, le=100, description="Number of results to return")
+    fields: Optional[List[ResultField]] = Field(
+        None,
+        min_length=1,
+        description="Paper fields to return (default: all). Score is always returned"
+    )
+    abstract_max_chars: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Truncate returned abstracts to this many characters"
+    )
+    paginate: bool = Field(
+        False,
+        description="Return a next_cursor for fetching further pages"
+    )
+    cursor: Optional[str] = Field(
+        None,
+        description="Cursor from a previous response to fetch the next page"
+    )
+    async_answer: bool = Field(
+        False,
+        description="Return papers immediately and generate the AI answer in the background"
+    )
+    alpha: Optional[float] = Field(
+        None,
+        ge=0.0,
+        le=1.0,
+        description="Hybrid weighting: 0 = pure keyword, 1 = pure vector (default from settings)"
+    )
+    fusion: Optional[FusionMethod] = Field(
+        None,
+        description="Hybrid fusion method (default from settings)"
+    )
+    rerank: bool = Field(
+        False,
+        description="Rescore the top candidates with a cross-encoder (not applied to paginated requests)"
+    )
+    year_from: Optional[int] = Field(None, ge=1500, le=2999, description="Only papers published in or after this year")
+    year_to: Optional[int] = Field(None, ge=1500, le=2999, description="Only papers published in or before this year")
+    journal: Optional[str] = Field(
+        None,
+        min_length=1,
+        max_length=200,
+        description="Only papers from this journal (matched on words, case-insensitive)"
+    )
+
+    @model_validator(mode="after")
+    def check_year_range(self):
+        if self.year_from is not None and self.year_to is not None and self.year_from > self.year_to:
+            raise ValueError("year_from must not be greater than year_to")
+        return self
+
+    def field_names(self) -> Optional[List[str]]:
+        """Selected field names, or None for all fields"""
+        return [field.value for field in self.fields] if self.fields else None
+
+    def search_filters(self) -> Optional[SearchFilters]:
+        """Metadata filters of the request, or None when unfiltered"""
+        journal = self.journal.strip() if self.journal else None
+        if self.year_from is None and self.year_to is None and not journal:
+            return None
+        return SearchFilters(year_from=self.year_from, year_to=self.year_to, journal=journal)
 
     class Config:
         json_schema_extra = {
@@ -24,8 +107,11 @@ class SearchRequest(BaseModel):
         }
 class SearchResult(BaseModel):
     """Individual search result model"""
-    title: str
-    abstract: str
+    # Weaviate properties backing the paper fields
+    PROPERTY_FIELDS: ClassVar[tuple] = tuple(field.value for field in ResultField)
+
+    title: Optional[str] = None
+    abstract: Optional[str] = None
     pmid: Optional[str] = None
     journal: Optional[str] = None
     year: Optional[str] = None
@@ -49,6 +135,7 @@ class SearchResponse(BaseModel):
     query: str
     mode: str
     search_time: Optional[float] = None
+    next_cursor: Optional[str] = None
 
     class Config:
         json_schema_extra = {
@@ -61,6 +148,33 @@ class SearchResponse(BaseModel):
             }
         }
 
+class BatchSearchRequest(BaseModel):
+    """Batch search request - many searches in one call"""
+    requests: List[SearchRequest] = Field(..., min_length=1, description="Searches to run")
+    stream: bool = Field(False, description="Return results as NDJSON, one line per search")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "requests": [
+                    {"query": "diabetes treatment", "mode": "hybrid", "limit": 10},
+                    {"query": "covid vaccine side effects", "mode": "semantic", "limit": 5}
+                ],
+                "stream": False
+            }
+        }
+
+class BatchSearchItem(SearchResponse):
+    """Result of one search in a batch"""
+    index: int = Field(..., description="Position of the search in the request")
+    error: Optional[str] = Field(None, description="Error message if this search failed")
+
+class BatchSearchResponse(BaseModel):
+    """Batch search response, results in request order"""
+    responses: List[BatchSearchItem]
+    total_count: int
+    search_time: float
+
 # New modles for RAG
 
 class AIAnswer(BaseModel):
@@ -70,6 +184,7 @@ class AIAnswer(BaseModel):
     tokens_used: int = Field(0, description="Number of tokens used")
     generation_time: float = Field(..., description="Time taken to generate answer in seconds")
     error: Optional[str] = Field(None, description="Error message if generation failed")
+    cached: bool = Field(False, description="Whether the answer was served from the answer cache")
 
     class Config:
         json_schema_extra = {
@@ -95,9 +210,11 @@ class UnifiedSearchResponse(BaseModel):
     results: List[SearchResult] = Field(..., description="List of retrieved papers")
     total_count: int = Field(..., description="Total number of results")
     search_time: float = Field(..., description="Time taken for search in seconds")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page (paginated requests)")
 
     # AI-generated answer
     ai_answer: Optional[AIAnswer] = Field(None, description="AI-generated answer based on retrieved papers")
+    answer_job_id: Optional[str] = Field(None, description="Job id to fetch the answer from /api/answers/{id} (async_answer)")
 
     # Metadata
     papers_analyzed: int = Field(0, description="Number of papers sent to LLM")
@@ -122,8 +239,21 @@ class UnifiedSearchResponse(BaseModel):
             }
         }
 
+class AnswerJobResponse(BaseModel):
+    """Status of a background answer job"""
+    job_id: str
+    status: str = Field(..., description="pending, running, done or failed")
+    ai_answer: Optional[AIAnswer] = None
+    papers_analyzed: int = 0
+    error: Optional[str] = None
+
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str
     weaviate_connected: bool
+    llm_connected: bool = False
+    ready: bool = Field(False, description="Whether the API is ready to serve searches")
+    encoder_ready: bool = Field(False, description="Whether the embedding model is loaded")
+    startup_error: Optional[str] = None
+    snapshot_age: Optional[float] = Field(None, description="Seconds since the connection status was refreshed")
     message: str
\ No newline at end of file
@@ -0,0 +1,174 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+import asyncio
+import time
+import uuid
+
+from ..config.settings import settings
+
+
+class AnswerQueueFullError(Exception):
+    """Raised when no more answer jobs can be queued"""
+
+
+class AnswerJob:
+    """State of one background answer generation"""
+
+    def __init__(self, job_id: str, generate: Callable[[], Awaitable[dict]], papers_analyzed: int):
+        self.id = job_id
+        self.generate = generate
+        self.papers_analyzed = papers_analyzed
+        self.status = "pending"  # pending -> running -> done | failed
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.done = asyncio.Event()
+
+
+class AnswerJobStore:
+    """
+    Bounded in-memory store of answer jobs with a background worker pool
+
+    Jobs are queued and run by a fixed number of worker tasks, so answer
+    generation concurrency is controlled separately from request handling.
+    Jobs expire job_ttl seconds after creation; when the store is full the
+    oldest jobs are dropped.
+    """
+
+    def __init__(self, max_jobs: int, job_ttl: float, workers: int, queue_size: int):
+        """
+        Args:
+            max_jobs: Maximum number of jobs kept (queued, running or finished)
+            job_ttl: Seconds a job is kept after it was created
+            workers: Number of concurrent answer generations
+            queue_size: Maximum number of jobs waiting for a worker
+        """
+        self.max_jobs = max_jobs
+        self.job_ttl = job_ttl
+        self.workers = workers
+        self.queue_size = queue_size
+
+        self._jobs: "OrderedDict[str, AnswerJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: list = []
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self):
+        """Start the worker pool on the running loop"""
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, generate: Callable[[], Awaitable[dict]], papers_analyzed: int = 0) -> str:
+        """
+        Queue an answer generation
+
+        Args:
+            generate: Coroutine function producing the LLM response dict
+            papers_analyzed: Number of papers sent to the LLM
+
+        Returns:
+            The job id
+        """
+        self.start()
+        self._expire()
+
+        job = AnswerJob(uuid.uuid4().hex, generate, papers_analyzed)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise AnswerQueueFullError("Answer queue is full, try again later")
+
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        self.submitted += 1
+        return job.id
+
+    def get(self, job_id: str) -> Optional[AnswerJob]:
+        """Get a job by id (None if unknown or expired)"""
+        self._expire()
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[AnswerJob]:
+        """Long-poll: wait up to timeout seconds for a job to finish"""
+        job = self.get(job_id)
+        if job is None or job.done.is_set() or timeout <= 0:
+            return job
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    async def _worker(self):
+        """Run queued jobs one at a time"""
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.id not in self._jobs:
+                    # Expired or evicted while queued
+                    continue
+                job.status = "running"
+                job.result = await job.generate()
+                job.error = job.result.get("error")
+                job.status = "failed" if job.error else "done"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                if job.status in ("done", "failed"):
+                    if job.status == "done":
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+                    job.finished_at = time.monotonic()
+                    job.done.set()
+                job.generate = None
+                self._queue.task_done()
+
+    def _expire(self):
+        """Drop jobs older than job_ttl (oldest are first)"""
+        now = time.monotonic()
+        while self._jobs:
+            job = next(iter(self._jobs.values()))
+            if now - job.created_at <= self.job_ttl:
+                break
+            self._jobs.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Return queue and job counters"""
+        return {
+            "jobs": len(self._jobs),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "workers": self.workers,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected
+        }
+
+    async def close(self):
+        """Stop the worker pool"""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+
+# Global instance (workers start with the app lifespan)
+answer_jobs = AnswerJobStore(
+    max_jobs=settings.ANSWER_JOB_MAX_JOBS,
+    job_ttl=settings.ANSWER_JOB_TTL,
+    workers=settings.ANSWER_JOB_WORKERS,
+    queue_size=settings.ANSWER_JOB_QUEUE_SIZE
+)
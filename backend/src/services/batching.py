@@ -0,0 +1,157 @@
+from concurrent.futures import Executor
+from typing import Callable, List, Optional
+import asyncio
+import time
+
+
+class BatchingEncoder:
+    """
+    Dynamic micro-batching of concurrent encode requests
+
+    Requests that arrive within a short window (or until the batch is full)
+    are grouped and encoded with a single batched model call on the encoder
+    executor. Each waiting request gets its own vector back. While every
+    executor slot is busy, new requests keep queueing, so batches grow with
+    load.
+    """
+
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str]], List[List[float]]],
+        executor: Executor,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 3.0,
+        max_concurrent_batches: int = 1
+    ):
+        """
+        Args:
+            encode_batch: Blocking function encoding a list of texts
+            executor: Executor the batches are run on
+            max_batch_size: Maximum number of texts per batch
+            max_wait_ms: Maximum time to wait for a batch to fill up
+            max_concurrent_batches: Number of batches encoded at the same time
+        """
+        self.encode_batch = encode_batch
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+
+        self._pending: list[tuple[str, asyncio.Future, float]] = []
+        self._has_items: Optional[asyncio.Event] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batch_tasks: set = set()
+
+        # Metrics
+        self.batches = 0
+        self.items = 0
+        self.total_queue_delay = 0.0
+        self.max_queue_delay = 0.0
+        self.total_encode_time = 0.0
+
+    async def encode(self, text: str) -> List[float]:
+        """Queue a text for the next batch and wait for its vector"""
+        self._ensure_started()
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future, time.perf_counter()))
+        self._has_items.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._batch_full.set()
+
+        return await future
+
+    def _ensure_started(self):
+        """Start the scheduler task on the running loop"""
+        if self._worker is not None and not self._worker.done():
+            return
+
+        self._has_items = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        """Collect pending requests into batches and dispatch them"""
+        while True:
+            # Wait for a free encoder slot; requests keep queueing meanwhile
+            await self._slots.acquire()
+
+            if not self._pending:
+                self._has_items.clear()
+                await self._has_items.wait()
+
+            # Give the batch a short window to fill up
+            if len(self._pending) < self.max_batch_size and self.max_wait > 0:
+                self._batch_full.clear()
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.max_wait)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+
+            task = asyncio.create_task(self._encode(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _encode(self, batch: list[tuple[str, asyncio.Future, float]]):
+        """Encode one batch on the executor and fan results back out"""
+        try:
+            dispatched_at = time.perf_counter()
+
+            # Identical texts in the same batch are encoded once
+            texts = list(dict.fromkeys(text for text, _, _ in batch))
+
+            try:
+                loop = asyncio.get_running_loop()
+                vectors = await loop.run_in_executor(self.executor, self.encode_batch, texts)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            # Only successful batches count, so the averages per item stay consistent
+            self.batches += 1
+            self.items += len(batch)
+            self.total_encode_time += time.perf_counter() - dispatched_at
+            for _, _, queued_at in batch:
+                delay = dispatched_at - queued_at
+                self.total_queue_delay += delay
+                self.max_queue_delay = max(self.max_queue_delay, delay)
+
+            by_text = dict(zip(texts, vectors))
+            for text, future, _ in batch:
+                # The caller may have gone away (cancelled request)
+                if not future.done():
+                    future.set_result(by_text[text])
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Return batching metrics"""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "pending": len(self._pending),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "avg_queue_delay_ms": round(self.total_queue_delay / self.items * 1000, 3) if self.items else 0.0,
+            "max_queue_delay_ms": round(self.max_queue_delay * 1000, 3),
+            "avg_encode_time_ms": round(self.total_encode_time / self.batches * 1000, 3) if self.batches else 0.0
+        }
+
+    async def close(self):
+        """Stop the scheduler task"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
@@ -0,0 +1,218 @@
+from typing import List, Optional
+import hashlib
+import math
+import os
+import re
+
+from ..models.search import SearchResult
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\[(])")
+PAPER_SEPARATOR = "\n---\n"
+
+
+# Files tiktoken reads its encodings from; the cached copy is looked up by
+# the SHA-1 of this URL (see tiktoken.load.read_file_cached)
+TIKTOKEN_FILES = {
+    "cl100k_base": "https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken",
+    "o200k_base": "https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken",
+}
+
+
+def cached_encoding_path(encoding_name: str, cache_dir: str) -> Optional[str]:
+    """Path of the pre-cached tiktoken file for an encoding (None if unknown)"""
+    url = TIKTOKEN_FILES.get(encoding_name)
+    if url is None:
+        return None
+    return os.path.join(cache_dir, hashlib.sha1(url.encode()).hexdigest())
+
+
+class TokenCounter:
+    """
+    Count prompt tokens with a local tokenizer
+
+    Uses tiktoken's cl100k_base by default, which is close to the Llama 3
+    tokenizer our Groq models use. The encoding is only read from
+    cache_dir, which is filled ahead of time by python -m
+    src.cache_tokenizer; nothing is downloaded at runtime. Until load() has
+    run, and when the encoding isn't cached or tiktoken is not installed,
+    tokens are estimated at ~4 characters per token.
+    """
+
+    def __init__(self, encoding_name: str = "cl100k_base", cache_dir: Optional[str] = None):
+        """
+        Args:
+            encoding_name: tiktoken encoding
+            cache_dir: Directory holding the pre-cached encoding file
+        """
+        self.encoding_name = encoding_name
+        self.cache_dir = cache_dir
+        self._encoding = None
+
+    def load(self) -> bool:
+        """
+        Load the encoding from the cache (blocking, run it off the event loop)
+
+        Returns:
+            True if counts now come from the tokenizer
+        """
+        if self._encoding is not None:
+            return True
+
+        path = cached_encoding_path(self.encoding_name, self.cache_dir) if self.cache_dir else None
+        if path is None or not os.path.exists(path):
+            print(f"Tokenizer '{self.encoding_name}' is not cached in {self.cache_dir} "
+                  f"(run python -m src.cache_tokenizer), estimating tokens from length")
+            return False
+
+        try:
+            # tiktoken finds the cached file there and doesn't fetch it
+            os.environ["TIKTOKEN_CACHE_DIR"] = self.cache_dir
+            import tiktoken
+
+            self._encoding = tiktoken.get_encoding(self.encoding_name)
+            return True
+        except Exception as e:
+            print(f"Tokenizer '{self.encoding_name}' unavailable ({e}), estimating tokens from length")
+            return False
+
+    def count(self, text: str) -> int:
+        """Number of tokens in text"""
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text) / 4)
+
+
+class ContextBuilder:
+    """
+    Pack retrieved papers into a token-budgeted LLM context
+
+    Every paper keeps its header (title, journal, PMID, score). The
+    remaining budget is split across abstracts in proportion to relevance
+    score; budget a short abstract doesn't need is handed to the others.
+    Abstracts are trimmed at sentence boundaries.
+    """
+
+    def __init__(self, token_budget: int, min_tokens_per_paper: int = 40, counter: Optional[TokenCounter] = None):
+        """
+        Args:
+            token_budget: Maximum tokens for the whole context
+            min_tokens_per_paper: Smallest abstract allocation worth sending
+            counter: Token counter (a length-estimating one is created if omitted)
+        """
+        self.token_budget = token_budget
+        self.min_tokens_per_paper = min_tokens_per_paper
+        self.counter = counter or TokenCounter()
+
+    def build(self, papers: List[SearchResult]) -> str:
+        """
+        Format papers into context string for LLM
+
+        Args:
+            papers: List of SearchResult objects, most relevant first
+
+        Returns:
+            Formatted context string within the token budget
+        """
+        if not papers:
+            return ""
+
+        headers = [self._header(i, paper) for i, paper in enumerate(papers, 1)]
+        footers = [self._footer(paper) for paper in papers]
+        fixed_tokens = sum(self.counter.count(text) for text in headers + footers)
+        fixed_tokens += self.counter.count(PAPER_SEPARATOR) * (len(papers) - 1)
+
+        sentences = [self._sentences(paper.abstract or "") for paper in papers]
+        sentence_tokens = [[self.counter.count(s) + 1 for s in paper_sentences] for paper_sentences in sentences]
+        needed = [sum(tokens) for tokens in sentence_tokens]
+
+        allocations = self._allocate(
+            max(0, self.token_budget - fixed_tokens),
+            self._weights(papers),
+            needed
+        )
+
+        context_parts = []
+        for header, footer, paper_sentences, tokens, allocation in zip(
+            headers, footers, sentences, sentence_tokens, allocations
+        ):
+            abstract = self._trim(paper_sentences, tokens, allocation)
+            context_parts.append(f"{header}{abstract}\n{footer}")
+
+        return PAPER_SEPARATOR.join(context_parts)
+
+    def _allocate(self, budget: int, weights: List[float], needed: List[int]) -> List[int]:
+        """Split budget by weight; surplus from papers needing less is redistributed"""
+        allocations = [0] * len(weights)
+        open_papers = [i for i, amount in enumerate(needed) if amount > 0]
+
+        while budget > 0 and open_papers:
+            total_weight = sum(weights[i] for i in open_papers)
+            shares = {i: int(budget * weights[i] / total_weight) for i in open_papers}
+
+            satisfied = [i for i in open_papers if allocations[i] + shares[i] >= needed[i]]
+            if not satisfied:
+                for i in open_papers:
+                    allocations[i] += shares[i]
+                break
+
+            # Fully fund papers whose whole abstract fits and re-split the rest
+            for i in satisfied:
+                budget -= needed[i] - allocations[i]
+                allocations[i] = needed[i]
+            open_papers = [i for i in open_papers if i not in satisfied]
+
+        return allocations
+
+    def _weights(self, papers: List[SearchResult]) -> List[float]:
+        """Relevance weights from scores (equal weights when scores are missing)"""
+        scores = [paper.score for paper in papers]
+        known = [score for score in scores if score is not None and score > 0]
+        if not known:
+            return [1.0] * len(papers)
+
+        # Floor keeps low-scored papers from being starved entirely
+        floor = 0.1 * max(known)
+        return [max(score or 0.0, floor) for score in scores]
+
+    def _trim(self, sentences: List[str], tokens: List[int], allocation: int) -> str:
+        """Keep whole sentences while they fit the allocation"""
+        if allocation < self.min_tokens_per_paper and sum(tokens) > allocation:
+            return "(omitted)"
+
+        kept = []
+        used = 0
+        for sentence, count in zip(sentences, tokens):
+            if used + count > allocation:
+                break
+            kept.append(sentence)
+            used += count
+
+        if not kept and sentences:
+            # First sentence alone is too long - cut it at a word boundary
+            words = sentences[0].split()
+            keep = max(1, int(len(words) * allocation / tokens[0]))
+            return " ".join(words[:keep]) + "..."
+
+        text = " ".join(kept)
+        return text + " ..." if len(kept) < len(sentences) else text
+
+    @staticmethod
+    def _sentences(text: str) -> List[str]:
+        """Split an abstract into sentences"""
+        return [s.strip() for s in SENTENCE_BOUNDARY.split(text.strip()) if s.strip()]
+
+    @staticmethod
+    def _header(index: int, paper: SearchResult) -> str:
+        return (
+            f"[{index}] Title: {paper.title}\n"
+            f"Journal: {paper.journal or 'N/A'} ({paper.year or 'N/A'})\n"
+            f"PMID: {paper.pmid or 'N/A'}\n"
+            f"Abstract: "
+        )
+
+    @staticmethod
+    def _footer(paper: SearchResult) -> str:
+        score = f"{paper.score:.3f}" if paper.score is not None else "N/A"
+        return f"Relevance Score: {score}\n"
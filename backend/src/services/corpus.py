@@ -0,0 +1,96 @@
+from itertools import islice
+from typing import Iterable, Iterator, List
+import json
+
+READ_CHUNK_CHARS = 1 << 20
+
+
+def iter_papers(filename: str, chunk_chars: int = READ_CHUNK_CHARS) -> Iterator[dict]:
+    """
+    Stream papers from a collected corpus file
+
+    Supports a JSON array (as written by the collectors, any indentation)
+    and JSON Lines. Papers are parsed incrementally, so memory use doesn't
+    depend on the file size and the first paper is available immediately.
+
+    Args:
+        filename: Path to a .json (array) or .jsonl file
+        chunk_chars: Characters read from the file at a time
+
+    Yields:
+        Paper dicts in file order
+    """
+    with open(filename, "r", encoding="utf-8") as f:
+        first = _first_char(f)
+        if first == "[":
+            yield from _iter_json_array(f, chunk_chars)
+        elif first:
+            yield from _iter_json_lines(f)
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    """Split an iterable into lists of at most size items"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _first_char(f) -> str:
+    """First non-whitespace character; the file is left positioned at it"""
+    while True:
+        position = f.tell()
+        char = f.read(1)
+        if not char or not char.isspace():
+            f.seek(position)
+            return char
+
+
+def _iter_json_lines(f) -> Iterator[dict]:
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+
+
+def _iter_json_array(f, chunk_chars: int) -> Iterator[dict]:
+    """Decode array elements one by one with JSONDecoder.raw_decode"""
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_chars)
+    position = buffer.index("[") + 1
+    eof = False
+
+    while True:
+        # Skip whitespace and separators between elements
+        while True:
+            while position < len(buffer) and (buffer[position].isspace() or buffer[position] == ","):
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            buffer, position = f.read(chunk_chars), 0
+            eof = not buffer
+
+        if position >= len(buffer):
+            raise ValueError("Unexpected end of file: JSON array is not closed")
+        if buffer[position] == "]":
+            return
+
+        try:
+            paper, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Element continues in the next chunk
+            chunk = f.read(chunk_chars)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+
+        yield paper
+        position = end
@@ -0,0 +1,289 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import mmap
+import os
+import re
+import shutil
+import time
+
+import numpy as np
+
+from ..models.search import SearchFilters
+
+# On-disk layout of an embedded index directory:
+#
+#   manifest.json          current generation and the directory holding it
+#   gen-<n>/vectors.npy    (N, dim) L2-normalized float16/float32 embeddings
+#   gen-<n>/ids.npy        (N,) object uuids as 36-byte strings
+#   gen-<n>/year_int.npy   (N,) int32 publication year, -1 when unknown
+#   gen-<n>/journal_codes.npy + journals.json   journal of each row
+#   gen-<n>/papers.jsonl + offsets.npy          row properties, one JSON per line
+#
+# Every array is memory-mapped, so opening an index is cheap regardless of
+# its size and pages are loaded by the OS on demand. A rebuild writes a new
+# gen-<n> directory and then swaps manifest.json atomically.
+MANIFEST_FILE = "manifest.json"
+
+# Rows scored per matrix-vector product (bounds the float32 scratch memory)
+SCORE_CHUNK_ROWS = 65536
+
+WORD_PATTERN = re.compile(r"[0-9a-z]+")
+
+
+def _words(text: str) -> set:
+    """Lowercase word tokens (matches Weaviate's word tokenization closely enough)"""
+    return set(WORD_PATTERN.findall((text or "").casefold()))
+
+
+def read_manifest(directory: Path) -> Optional[dict]:
+    """Current manifest of an index directory (None if there is no index)"""
+    try:
+        with open(Path(directory) / MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+class EmbeddedIndex:
+    """
+    Read-only, memory-mapped vector index of one generation
+
+    near_vector is a brute-force matrix-vector product over the mapped
+    embeddings (BLAS, in row chunks) followed by an argpartition top-k.
+    Filters are applied as a row mask before scoring.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Index directory containing manifest.json
+        """
+        self.directory = Path(directory)
+        manifest = read_manifest(self.directory)
+        if manifest is None:
+            raise FileNotFoundError(f"No embedded index in {self.directory}")
+
+        data_dir = self.directory / manifest["directory"]
+        self.generation = manifest["generation"]
+        self.model = manifest.get("model")
+
+        self.vectors = np.load(data_dir / "vectors.npy", mmap_mode="r")
+        self.ids = np.load(data_dir / "ids.npy", mmap_mode="r")
+        self.year_int = np.load(data_dir / "year_int.npy", mmap_mode="r")
+        self.journal_codes = np.load(data_dir / "journal_codes.npy", mmap_mode="r")
+        self.offsets = np.load(data_dir / "offsets.npy", mmap_mode="r")
+        with open(data_dir / "journals.json", "r", encoding="utf-8") as f:
+            self.journals: List[str] = json.load(f)
+
+        self._papers = None
+        if len(self) > 0:
+            with open(data_dir / "papers.jsonl", "rb") as f:
+                self._papers = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._row_by_id: Optional[Dict[str, int]] = None
+        self._journal_words = [_words(journal) for journal in self.journals]
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def search(
+        self,
+        vector: List[float],
+        limit: int,
+        filters: Optional[SearchFilters] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k rows by cosine similarity
+
+        Args:
+            vector: Query embedding
+            limit: Number of rows to return
+            filters: Optional year range / journal filters
+
+        Returns:
+            List of (row, similarity), most similar first
+        """
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        rows = self._filtered_rows(filters)
+        if rows is None:
+            scores = self._scores(self.vectors, query)
+        else:
+            scores = self._scores_for_rows(rows, query)
+
+        k = min(limit, scores.shape[0])
+        if k <= 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        if rows is not None:
+            return [(int(rows[i]), float(scores[i])) for i in top]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def _scores(self, vectors: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Dot products of all rows with the query, chunk by chunk"""
+        scores = np.empty(vectors.shape[0], dtype=np.float32)
+        for start in range(0, vectors.shape[0], SCORE_CHUNK_ROWS):
+            chunk = np.asarray(vectors[start:start + SCORE_CHUNK_ROWS], dtype=np.float32)
+            scores[start:start + SCORE_CHUNK_ROWS] = chunk @ query
+        return scores
+
+    def _scores_for_rows(self, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Dot products of selected rows with the query"""
+        scores = np.empty(rows.shape[0], dtype=np.float32)
+        for start in range(0, rows.shape[0], SCORE_CHUNK_ROWS):
+            chunk_rows = rows[start:start + SCORE_CHUNK_ROWS]
+            scores[start:start + SCORE_CHUNK_ROWS] = self.vectors[chunk_rows].astype(np.float32) @ query
+        return scores
+
+    def _filtered_rows(self, filters: Optional[SearchFilters]) -> Optional[np.ndarray]:
+        """Row numbers passing the filters (None when unfiltered)"""
+        if filters is None:
+            return None
+
+        mask = None
+        if filters.year_from is not None or filters.year_to is not None:
+            year_from = filters.year_from if filters.year_from is not None else 0
+            year_to = filters.year_to if filters.year_to is not None else np.iinfo(np.int32).max
+            # Unknown years are stored as -1 and never match a year filter
+            mask = (self.year_int >= max(year_from, 0)) & (self.year_int <= year_to)
+
+        if filters.journal:
+            wanted = _words(filters.journal)
+            codes = [code for code, words in enumerate(self._journal_words) if wanted <= words]
+            journal_mask = np.isin(self.journal_codes, codes)
+            mask = journal_mask if mask is None else mask & journal_mask
+
+        if mask is None:
+            return None
+        return np.flatnonzero(mask)
+
+    def uuid(self, row: int) -> str:
+        """Object uuid of a row"""
+        return self.ids[row].decode("ascii")
+
+    def properties(self, row: int, fields: Optional[List[str]] = None) -> dict:
+        """Stored properties of a row (only the given fields, if any)"""
+        props = json.loads(self._papers[int(self.offsets[row]):int(self.offsets[row + 1])])
+        if fields is None:
+            return props
+        return {name: props.get(name) for name in fields}
+
+    def rows_for_ids(self, ids: List[str]) -> Dict[str, int]:
+        """Row numbers of the given uuids (unknown ids are left out)"""
+        if self._row_by_id is None:
+            # Built on first use only (pagination); search never needs it
+            self._row_by_id = {self.uuid(row): row for row in range(len(self))}
+        return {object_id: self._row_by_id[object_id] for object_id in ids if object_id in self._row_by_id}
+
+
+def write_index(
+    directory: str,
+    records: Iterable[Tuple[str, dict, List[float]]],
+    dimension: int,
+    dtype: str = "float16",
+    model: Optional[str] = None,
+    keep_generations: int = 2
+) -> dict:
+    """
+    Write a new index generation and make it current
+
+    Records are streamed to disk, so memory use doesn't grow with the
+    number of papers (apart from the id/year/journal columns).
+
+    Args:
+        directory: Index directory (created if missing)
+        records: Iterable of (uuid, properties, vector)
+        dimension: Embedding dimension
+        dtype: float16 (half the size) or float32
+        model: Embedding model name, recorded in the manifest
+        keep_generations: Generation directories kept, including the new one
+
+    Returns:
+        The new manifest
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    previous = read_manifest(directory)
+    generation = previous["generation"] + 1 if previous else 1
+    data_dir = directory / f"gen-{generation}"
+    if data_dir.exists():
+        shutil.rmtree(data_dir)
+    data_dir.mkdir()
+
+    ids: List[bytes] = []
+    years: List[int] = []
+    journal_codes: List[int] = []
+    journals: Dict[str, int] = {}
+    offsets = [0]
+
+    raw_path = data_dir / "vectors.raw"
+    with open(raw_path, "wb") as raw, open(data_dir / "papers.jsonl", "wb") as papers:
+        for object_id, props, vector in records:
+            vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+            if vector.shape[0] != dimension:
+                raise ValueError(f"Vector of {object_id} has dimension {vector.shape[0]}, expected {dimension}")
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                vector = vector / norm
+            raw.write(vector.astype(dtype).tobytes())
+
+            line = json.dumps(props, ensure_ascii=False).encode("utf-8") + b"\n"
+            papers.write(line)
+            offsets.append(offsets[-1] + len(line))
+
+            ids.append(str(object_id).encode("ascii"))
+            year = props.get("year_int")
+            years.append(year if isinstance(year, int) else -1)
+            journal_codes.append(journals.setdefault(props.get("journal") or "", len(journals)))
+
+    # Wrap the raw vectors in an .npy file without loading them
+    count = len(ids)
+    if count:
+        raw_vectors = np.memmap(raw_path, dtype=dtype, mode="r", shape=(count, dimension))
+        vectors = np.lib.format.open_memmap(data_dir / "vectors.npy", mode="w+", dtype=dtype, shape=(count, dimension))
+        for start in range(0, count, SCORE_CHUNK_ROWS):
+            vectors[start:start + SCORE_CHUNK_ROWS] = raw_vectors[start:start + SCORE_CHUNK_ROWS]
+        vectors.flush()
+        del vectors, raw_vectors
+    else:
+        np.save(data_dir / "vectors.npy", np.empty((0, dimension), dtype=dtype))
+    os.remove(raw_path)
+
+    np.save(data_dir / "ids.npy", np.array(ids, dtype="S36"))
+    np.save(data_dir / "year_int.npy", np.array(years, dtype=np.int32))
+    np.save(data_dir / "journal_codes.npy", np.array(journal_codes, dtype=np.int32))
+    np.save(data_dir / "offsets.npy", np.array(offsets, dtype=np.int64))
+    with open(data_dir / "journals.json", "w", encoding="utf-8") as f:
+        json.dump(list(journals), f, ensure_ascii=False)
+
+    manifest = {
+        "generation": generation,
+        "directory": data_dir.name,
+        "count": count,
+        "dimension": dimension,
+        "dtype": dtype,
+        "model": model,
+        "created_at": time.time()
+    }
+    tmp_path = directory / f"{MANIFEST_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, directory / MANIFEST_FILE)
+
+    # Old generations may still be mapped by running servers; on POSIX the
+    # mapping survives deletion, but keep the previous one for rollbacks
+    for old in directory.glob("gen-*"):
+        try:
+            if int(old.name.split("-", 1)[1]) <= generation - keep_generations:
+                shutil.rmtree(old)
+        except ValueError:
+            continue
+
+    return manifest
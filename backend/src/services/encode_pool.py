@@ -0,0 +1,104 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+import math
+import multiprocessing
+import os
+
+import numpy as np
+
+# Model of the current worker process (set by the pool initializer)
+_worker_model = None
+
+
+def _init_worker(backend: Optional[str], model_name: Optional[str], torch_threads: int):
+    """Load the encoder once per worker process"""
+    global _worker_model
+    import torch
+
+    torch.set_num_threads(torch_threads)
+    from .encoders import load_encoder
+
+    _worker_model = load_encoder(backend, model_name)
+
+
+def _encode_chunk(texts: List[str], batch_size: int) -> np.ndarray:
+    return _worker_model.encode(
+        texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        show_progress_bar=False
+    ).astype(np.float32)
+
+
+class EncodePool:
+    """
+    Multi-process embedding for bulk ingestion
+
+    Each worker process loads its own copy of the encoder and is limited
+    to torch_threads intra-op threads, so workers x threads matches the
+    cores instead of every process fighting over all of them. Texts are
+    sorted by length before being split into per-worker chunks, so batches
+    hold similarly sized texts and little compute is spent on padding.
+    Output rows are always in input order, and the chunking only depends
+    on the input, so results are deterministic.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        torch_threads: int = 0,
+        batch_size: int = 32,
+        backend: Optional[str] = None,
+        model_name: Optional[str] = None
+    ):
+        """
+        Args:
+            workers: Number of encoder processes
+            torch_threads: Torch threads per worker (0 = cores / workers)
+            batch_size: Model batch size inside a worker
+            backend: Encoder backend (default: ENCODER_BACKEND)
+            model_name: Embedding model (default: EMBEDDING_MODEL)
+        """
+        self.workers = workers
+        self.batch_size = batch_size
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // workers)
+
+        # spawn: workers must not inherit torch/grpc state from the parent
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(backend, model_name, self.torch_threads)
+        )
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts across the worker processes
+
+        Returns:
+            float32 array with one row per text, in input order
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        # Whole model batches per chunk, enough chunks to keep every worker busy
+        chunk_size = math.ceil(len(texts) / self.workers / self.batch_size) * self.batch_size
+        chunks = [order[start:start + chunk_size] for start in range(0, len(order), chunk_size)]
+
+        futures = [
+            self._executor.submit(_encode_chunk, [texts[i] for i in chunk], self.batch_size)
+            for chunk in chunks
+        ]
+
+        vectors = None
+        for chunk, future in zip(chunks, futures):
+            chunk_vectors = future.result()
+            if vectors is None:
+                vectors = np.empty((len(texts), chunk_vectors.shape[1]), dtype=np.float32)
+            vectors[chunk] = chunk_vectors
+        return vectors
+
+    def close(self):
+        """Stop the worker processes"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,135 @@
+from sentence_transformers import SentenceTransformer
+from typing import List, Optional
+import importlib.util
+import time
+
+import numpy as np
+
+from ..config.settings import settings
+
+# Supported encoder backends
+#   torch - PyTorch fp32 (reference)
+#   onnx  - ONNX Runtime (needs: pip install -r requirements-onnx.txt)
+#   int8  - PyTorch with Linear layers dynamically quantized to int8
+ENCODER_BACKENDS = ("torch", "onnx", "int8")
+
+# Short medical queries used to compare a backend against fp32
+PARITY_SENTENCES = [
+    "diabetes treatment",
+    "covid vaccine side effects",
+    "heart attack prevention",
+    "alzheimer's disease symptoms",
+    "cancer immunotherapy",
+    "Metformin reduces hepatic glucose production in type 2 diabetes.",
+    "Randomized controlled trial of statins for primary prevention of cardiovascular events.",
+    "Long-term outcomes of mRNA vaccination in immunocompromised patients."
+]
+
+
+def load_encoder(backend: Optional[str] = None, model_name: Optional[str] = None) -> SentenceTransformer:
+    """
+    Load the embedding model with the selected CPU backend
+
+    Args:
+        backend: One of ENCODER_BACKENDS (default: settings.ENCODER_BACKEND)
+        model_name: Sentence-transformers model (default: settings.EMBEDDING_MODEL)
+
+    Returns:
+        A SentenceTransformer whose encode() uses the selected backend
+    """
+    backend = (backend or settings.ENCODER_BACKEND).lower()
+    model_name = model_name or settings.EMBEDDING_MODEL
+
+    if backend == "torch":
+        return SentenceTransformer(model_name, device="cpu")
+
+    if backend == "onnx":
+        missing = [name for name in ("onnxruntime", "optimum") if importlib.util.find_spec(name) is None]
+        if missing:
+            raise ImportError(
+                f"ENCODER_BACKEND=onnx needs {', '.join(missing)}: "
+                "pip install -r requirements-onnx.txt"
+            )
+        model_kwargs = {}
+        if settings.ONNX_MODEL_FILE:
+            # e.g. onnx/model_qint8_avx512_vnni.onnx for a pre-quantized export
+            model_kwargs["file_name"] = settings.ONNX_MODEL_FILE
+        return SentenceTransformer(
+            model_name,
+            device="cpu",
+            backend="onnx",
+            model_kwargs=model_kwargs
+        )
+
+    if backend == "int8":
+        import torch
+
+        model = SentenceTransformer(model_name, device="cpu")
+        torch.ao.quantization.quantize_dynamic(
+            model,
+            {torch.nn.Linear},
+            dtype=torch.qint8,
+            inplace=True
+        )
+        return model
+
+    raise ValueError(f"Unknown encoder backend '{backend}'. Choose one of: {', '.join(ENCODER_BACKENDS)}")
+
+
+def check_parity(
+    encoder: SentenceTransformer,
+    reference: Optional[SentenceTransformer] = None,
+    sentences: Optional[List[str]] = None
+) -> dict:
+    """
+    Compare an encoder against the fp32 PyTorch model
+
+    Args:
+        encoder: Encoder to check
+        reference: fp32 reference encoder (loaded if not given)
+        sentences: Sentences to embed (default: PARITY_SENTENCES)
+
+    Returns:
+        dict with 'mean_cosine', 'min_cosine' and 'sentences'
+    """
+    sentences = sentences or PARITY_SENTENCES
+    reference = reference or load_encoder("torch")
+
+    ours = encoder.encode(sentences, normalize_embeddings=True)
+    theirs = reference.encode(sentences, normalize_embeddings=True)
+    cosines = np.sum(np.asarray(ours) * np.asarray(theirs), axis=1)
+
+    return {
+        "mean_cosine": round(float(cosines.mean()), 6),
+        "min_cosine": round(float(cosines.min()), 6),
+        "sentences": len(sentences)
+    }
+
+
+def benchmark_encoder(encoder: SentenceTransformer, sentences: Optional[List[str]] = None, rounds: int = 20) -> float:
+    """Return the mean single-query encode latency in milliseconds"""
+    sentences = sentences or PARITY_SENTENCES
+    encoder.encode(sentences[0])  # warm-up
+
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        for sentence in sentences:
+            encoder.encode(sentence)
+    return (time.perf_counter() - start_time) / (rounds * len(sentences)) * 1000
+
+
+if __name__ == "__main__":
+    # Usage (from backend/): python -m src.services.encoders [backend ...]
+    import sys
+
+    backends = sys.argv[1:] or list(ENCODER_BACKENDS)
+    reference = load_encoder("torch")
+
+    print(f"Model: {settings.EMBEDDING_MODEL}")
+    print("="*70)
+    for name in backends:
+        encoder = reference if name == "torch" else load_encoder(name)
+        parity = check_parity(encoder, reference)
+        latency = benchmark_encoder(encoder)
+        print(f"{name:>6}: {latency:.2f} ms/query  "
+              f"cosine mean={parity['mean_cosine']:.4f} min={parity['min_cosine']:.4f}")
@@ -0,0 +1,86 @@
+from typing import Dict, List, NamedTuple, Optional
+
+
+class Hit(NamedTuple):
+    """One search hit: object id, fetched properties and score"""
+    uuid: str
+    properties: dict
+    score: Optional[float]
+
+
+def reciprocal_rank_fusion(
+    vector_hits: List[Hit],
+    keyword_hits: List[Hit],
+    alpha: float,
+    k: int = 60
+) -> List[Hit]:
+    """
+    Weighted reciprocal rank fusion
+
+    Each hit scores alpha / (k + rank) from the vector leg plus
+    (1 - alpha) / (k + rank) from the keyword leg (ranks start at 1).
+    Only ranks matter, so the legs' score scales don't need to agree.
+
+    Args:
+        vector_hits: near_vector results, best first
+        keyword_hits: bm25 results, best first
+        alpha: Vector weight (0 = pure keyword, 1 = pure vector)
+        k: Rank damping constant
+
+    Returns:
+        Fused hits, best first, scored with the fused score
+    """
+    scores: Dict[str, float] = {}
+    for hits, weight in ((vector_hits, alpha), (keyword_hits, 1 - alpha)):
+        for rank, hit in enumerate(hits, 1):
+            scores[hit.uuid] = scores.get(hit.uuid, 0.0) + weight / (k + rank)
+    return _ranked(scores, vector_hits, keyword_hits)
+
+
+def relative_score_fusion(
+    vector_hits: List[Hit],
+    keyword_hits: List[Hit],
+    alpha: float
+) -> List[Hit]:
+    """
+    Min-max normalized score fusion (Weaviate's relativeScoreFusion)
+
+    Each leg's scores are scaled to [0, 1] and combined as
+    alpha * vector + (1 - alpha) * keyword; a hit missing from a leg gets
+    0 for that leg.
+
+    Args:
+        vector_hits: near_vector results, best first
+        keyword_hits: bm25 results, best first
+        alpha: Vector weight (0 = pure keyword, 1 = pure vector)
+
+    Returns:
+        Fused hits, best first, scored with the fused score
+    """
+    scores: Dict[str, float] = {}
+    for hits, weight in ((vector_hits, alpha), (keyword_hits, 1 - alpha)):
+        for uuid, normalized in _normalize(hits).items():
+            scores[uuid] = scores.get(uuid, 0.0) + weight * normalized
+    return _ranked(scores, vector_hits, keyword_hits)
+
+
+def _normalize(hits: List[Hit]) -> Dict[str, float]:
+    """Min-max normalize a leg's scores (all 1.0 when they are equal)"""
+    values = [hit.score or 0.0 for hit in hits]
+    if not values:
+        return {}
+    low, high = min(values), max(values)
+    if high == low:
+        return {hit.uuid: 1.0 for hit in hits}
+    return {hit.uuid: (value - low) / (high - low) for hit, value in zip(hits, values)}
+
+
+def _ranked(scores: Dict[str, float], *legs: List[Hit]) -> List[Hit]:
+    """Hits sorted by fused score, taking properties from the first leg that has them"""
+    properties: Dict[str, dict] = {}
+    for hits in legs:
+        for hit in hits:
+            properties.setdefault(hit.uuid, hit.properties)
+
+    ordered = sorted(scores.items(), key=lambda item: -item[1])
+    return [Hit(uuid, properties[uuid], score) for uuid, score in ordered]
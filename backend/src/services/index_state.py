@@ -0,0 +1,86 @@
+from weaviate.classes.config import Configure, Property, DataType
+from weaviate.util import generate_uuid5
+from typing import Optional
+
+# Small side collection holding one generation counter per indexed collection.
+# Writers bump the counter after changing the index; readers (the API caches)
+# compare it to invalidate cached results.
+INDEX_STATE_COLLECTION = "IndexState"
+
+
+def index_state_uuid(collection_name: str) -> str:
+    """Deterministic object id of the state record for a collection"""
+    return generate_uuid5(collection_name, INDEX_STATE_COLLECTION)
+
+
+def ensure_index_state_collection(client) -> None:
+    """Create the index state collection if it does not exist (sync client)"""
+    if client.collections.exists(INDEX_STATE_COLLECTION):
+        return
+
+    client.collections.create(
+        name=INDEX_STATE_COLLECTION,
+        description="Index generation counters used for cache invalidation",
+        vector_config=Configure.Vectors.self_provided(),
+        properties=[
+            Property(
+                name="collection",
+                data_type=DataType.TEXT,
+                description="Name of the indexed collection"
+            ),
+            Property(
+                name="generation",
+                data_type=DataType.INT,
+                description="Incremented every time the collection changes"
+            ),
+        ]
+    )
+
+
+def bump_index_generation(client, collection_name: str) -> int:
+    """
+    Increment the index generation of a collection (sync client)
+
+    Args:
+        client: Connected synchronous Weaviate client
+        collection_name: Name of the collection that was modified
+
+    Returns:
+        The new generation number
+    """
+    ensure_index_state_collection(client)
+    state = client.collections.get(INDEX_STATE_COLLECTION)
+    uuid = index_state_uuid(collection_name)
+
+    obj = state.query.fetch_object_by_id(uuid)
+    generation = (obj.properties.get("generation") or 0) + 1 if obj else 1
+    properties = {"collection": collection_name, "generation": generation}
+
+    if obj:
+        state.data.replace(uuid=uuid, properties=properties)
+    else:
+        state.data.insert(uuid=uuid, properties=properties)
+
+    return generation
+
+
+async def fetch_index_generation(client, collection_name: str) -> Optional[int]:
+    """
+    Read the index generation of a collection (async client)
+
+    Returns:
+        The generation number, 0 if it was never bumped, or None if it
+        could not be read
+    """
+    try:
+        if not await client.collections.exists(INDEX_STATE_COLLECTION):
+            return 0
+
+        state = client.collections.get(INDEX_STATE_COLLECTION)
+        obj = await state.query.fetch_object_by_id(index_state_uuid(collection_name))
+        if obj is None:
+            return 0
+        return obj.properties.get("generation") or 0
+    except Exception as e:
+        print(f"Could not read index generation: {e}")
+        return None
@@ -0,0 +1,210 @@
+from typing import Any, Callable, Iterable, List, Optional
+import queue
+import threading
+import time
+
+from .corpus import batched
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+class StageStats:
+    """Throughput counters of one pipeline stage"""
+
+    def __init__(self, name: str, workers: int = 1):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.batches = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, items: int, seconds: float, failed: bool = False):
+        with self._lock:
+            self.batches += 1
+            self.busy_seconds += seconds
+            if failed:
+                self.failed += items
+            else:
+                self.items += items
+
+    def as_dict(self, elapsed: float) -> dict:
+        # Busy rate = what the stage could sustain if it never waited on
+        # its neighbours; the stage with the lowest one is the bottleneck
+        busy_per_worker = self.busy_seconds / self.workers
+        return {
+            "items": self.items,
+            "failed": self.failed,
+            "batches": self.batches,
+            "docs_per_sec": round(self.items / elapsed, 1) if elapsed else 0.0,
+            "busy_docs_per_sec": round(self.items / busy_per_worker, 1) if busy_per_worker else 0.0,
+            "utilization": round(busy_per_worker / elapsed, 3) if elapsed else 0.0
+        }
+
+
+class IngestPipeline:
+    """
+    Staged ingestion: read -> encode (N worker threads) -> upload
+
+    Stages run concurrently and hand batches over through bounded queues,
+    so encoding overlaps network writes and a slow stage applies
+    backpressure instead of letting batches pile up in memory. End-to-end
+    throughput approaches that of the slowest stage.
+
+    The upload stage runs in the thread calling run(), so a Weaviate batch
+    context opened by the caller is only used from that thread.
+
+    An exception raised by the papers iterable ends the read stage; the
+    batches already read are still encoded and uploaded, then run()
+    re-raises it so the caller knows the input was only partly processed.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[dict]], Any],
+        encode_workers: int = 2,
+        batch_size: int = 100,
+        queue_size: int = 4
+    ):
+        """
+        Args:
+            encode: Returns the vectors of a batch of papers (blocking)
+            encode_workers: Threads running encode
+            batch_size: Papers per batch
+            queue_size: Batches buffered between two stages
+        """
+        self.encode = encode
+        self.encode_workers = encode_workers
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+
+        self.read_stats = StageStats("read")
+        self.encode_stats = StageStats("encode", encode_workers)
+        self.upload_stats = StageStats("upload")
+        self._started_at: Optional[float] = None
+        self._stop = threading.Event()
+        self.read_error: Optional[BaseException] = None
+
+    def run(self, papers: Iterable[dict], upload: Callable[[List[dict], Any], None]) -> dict:
+        """
+        Run the pipeline until papers is exhausted
+
+        Args:
+            papers: Papers to ingest (typically a streaming generator)
+            upload: Writes one encoded batch (called from this thread)
+
+        Returns:
+            Per-stage counters, see stats()
+
+        Raises:
+            The exception raised by papers, after the batches read before
+            it have been uploaded
+        """
+        self._started_at = time.perf_counter()
+        encode_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        upload_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        threads = [threading.Thread(target=self._read, args=(papers, encode_queue), name="ingest-read", daemon=True)]
+        threads += [
+            threading.Thread(target=self._encode, args=(encode_queue, upload_queue), name=f"ingest-encode-{i}", daemon=True)
+            for i in range(self.encode_workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            self._upload(upload_queue, upload)
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join(timeout=1)
+
+        if self.read_error is not None:
+            raise self.read_error
+        return self.stats()
+
+    def stats(self) -> dict:
+        """Items, failures, batches and docs/sec of every stage"""
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            "elapsed": round(elapsed, 1),
+            **{stage.name: stage.as_dict(elapsed) for stage in (self.read_stats, self.encode_stats, self.upload_stats)}
+        }
+
+    def progress(self) -> dict:
+        """Compact docs/sec per stage, e.g. for a tqdm postfix"""
+        stats = self.stats()
+        return {name: stats[name]["docs_per_sec"] for name in ("read", "encode", "upload")}
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        """Blocking put that gives up when the pipeline is stopping"""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read(self, papers: Iterable[dict], encode_queue: queue.Queue):
+        try:
+            iterator = iter(batched(papers, self.batch_size))
+            while True:
+                start_time = time.perf_counter()
+                batch = next(iterator, None)
+                if batch is None:
+                    break
+                self.read_stats.record(len(batch), time.perf_counter() - start_time)
+                if not self._put(encode_queue, batch):
+                    return
+        except Exception as e:
+            # Re-raised by run() once the batches already read are uploaded
+            self.read_error = e
+        finally:
+            # One end marker per encode worker
+            for _ in range(self.encode_workers):
+                self._put(encode_queue, _DONE)
+
+    def _encode(self, encode_queue: queue.Queue, upload_queue: queue.Queue):
+        try:
+            while not self._stop.is_set():
+                try:
+                    batch = encode_queue.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                if batch is _DONE:
+                    break
+
+                start_time = time.perf_counter()
+                try:
+                    vectors = self.encode(batch)
+                except Exception as e:
+                    print(f"\n Encode error: {e}")
+                    self.encode_stats.record(len(batch), time.perf_counter() - start_time, failed=True)
+                    continue
+                self.encode_stats.record(len(batch), time.perf_counter() - start_time)
+
+                if not self._put(upload_queue, (batch, vectors)):
+                    return
+        finally:
+            self._put(upload_queue, _DONE)
+
+    def _upload(self, upload_queue: queue.Queue, upload: Callable[[List[dict], Any], None]):
+        finished_workers = 0
+        while finished_workers < self.encode_workers:
+            item = upload_queue.get()
+            if item is _DONE:
+                finished_workers += 1
+                continue
+
+            batch, vectors = item
+            start_time = time.perf_counter()
+            try:
+                upload(batch, vectors)
+            except Exception as e:
+                print(f"\n Batch upload error: {e}")
+                self.upload_stats.record(len(batch), time.perf_counter() - start_time, failed=True)
+                continue
+            self.upload_stats.record(len(batch), time.perf_counter() - start_time)
@@ -0,0 +1,232 @@
+from collections import deque
+from typing import Any, AsyncIterator, Optional
+import asyncio
+import random
+import time
+
+
+class LLMTimeoutError(Exception):
+    """Raised when an LLM call does not finish within its deadline"""
+
+
+def is_retriable(error: Exception) -> bool:
+    """Whether an LLM API error is worth retrying (429, 5xx, connection errors)"""
+    import groq
+
+    if isinstance(error, (groq.APIConnectionError, groq.APITimeoutError)):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return status_code == 429 or (status_code is not None and status_code >= 500)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait (Retry-After header), if any"""
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except Exception:
+        return None
+
+
+class LLMClient:
+    """
+    Async chat-completions client with bounded concurrency and fault handling
+
+    Wraps an AsyncGroq client:
+    - at most max_concurrency calls are in flight; others wait for a slot
+    - every call has a deadline covering all its retries
+    - 429/5xx/connection errors are retried with jittered exponential
+      backoff (honoring Retry-After)
+    - optionally, a non-streaming call still running after the hedge delay
+      (the observed p95 latency by default) gets a duplicate request and
+      the first response wins
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_concurrency: int = 8,
+        timeout: float = 30.0,
+        max_retries: int = 2,
+        retry_base_delay: float = 0.5,
+        hedge_enabled: bool = False,
+        hedge_delay: float = 0.0,
+        hedge_min_samples: int = 20
+    ):
+        """
+        Args:
+            client: AsyncGroq client (created with max_retries=0)
+            max_concurrency: Maximum number of in-flight calls
+            timeout: Deadline per call in seconds, including retries
+            max_retries: Retries after the first attempt
+            retry_base_delay: Base delay of the exponential backoff
+            hedge_enabled: Send a hedged duplicate for slow calls
+            hedge_delay: Fixed hedge delay; 0 uses the observed p95 latency
+            hedge_min_samples: Latency samples needed before using the p95
+        """
+        self.client = client
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.hedge_enabled = hedge_enabled
+        self.hedge_delay = hedge_delay
+        self.hedge_min_samples = hedge_min_samples
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._latencies: deque = deque(maxlen=500)
+
+        self.in_flight = 0
+        self.calls = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    async def create(self, **kwargs) -> Any:
+        """chat.completions.create with deadline, retries and hedging"""
+        deadline = time.monotonic() + self.timeout
+        attempt = 0
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.timeouts += 1
+                raise LLMTimeoutError(f"LLM call exceeded its {self.timeout:.0f}s deadline")
+
+            try:
+                return await asyncio.wait_for(self._hedged_call(kwargs), remaining)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise LLMTimeoutError(f"LLM call exceeded its {self.timeout:.0f}s deadline")
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retriable(e):
+                    raise
+                attempt += 1
+                self.retries += 1
+                await asyncio.sleep(min(self._backoff(attempt, e), max(0.0, deadline - time.monotonic())))
+
+    async def stream(self, **kwargs) -> AsyncIterator[Any]:
+        """
+        Streaming chat.completions.create
+
+        Holds one concurrency slot for the whole stream. Opening the stream
+        is retried like create(); once chunks flow, errors are raised. The
+        deadline covers the whole stream. Streams are never hedged.
+        """
+        deadline = time.monotonic() + self.timeout
+        attempt = 0
+        stream = None
+
+        async with self._semaphore:
+            self.in_flight += 1
+            self.calls += 1
+            try:
+                while True:
+                    try:
+                        stream = await asyncio.wait_for(
+                            self.client.chat.completions.create(stream=True, **kwargs),
+                            max(0.0, deadline - time.monotonic())
+                        )
+                        break
+                    except asyncio.TimeoutError:
+                        self.timeouts += 1
+                        raise LLMTimeoutError(f"LLM call exceeded its {self.timeout:.0f}s deadline")
+                    except Exception as e:
+                        if attempt >= self.max_retries or not is_retriable(e):
+                            raise
+                        attempt += 1
+                        self.retries += 1
+                        await asyncio.sleep(min(self._backoff(attempt, e), max(0.0, deadline - time.monotonic())))
+
+                iterator = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(
+                            iterator.__anext__(),
+                            max(0.0, deadline - time.monotonic())
+                        )
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        self.timeouts += 1
+                        raise LLMTimeoutError(f"LLM stream exceeded its {self.timeout:.0f}s deadline")
+                    yield chunk
+            finally:
+                self.in_flight -= 1
+                if stream is not None and hasattr(stream, "close"):
+                    await stream.close()
+
+    async def _hedged_call(self, kwargs: dict) -> Any:
+        """One attempt, plus a hedged duplicate if the first is slow"""
+        primary = asyncio.create_task(self._call(kwargs))
+        tasks = {primary}
+        try:
+            if self.hedge_enabled:
+                done, _ = await asyncio.wait(tasks, timeout=self._current_hedge_delay())
+                # Only hedge when it doesn't take a slot away from other requests
+                if not done and not self._semaphore.locked():
+                    self.hedges += 1
+                    tasks.add(asyncio.create_task(self._call(kwargs)))
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _call(self, kwargs: dict) -> Any:
+        """A single request under the concurrency limit"""
+        async with self._semaphore:
+            self.in_flight += 1
+            self.calls += 1
+            start_time = time.monotonic()
+            try:
+                response = await self.client.chat.completions.create(**kwargs)
+                self._latencies.append(time.monotonic() - start_time)
+                return response
+            finally:
+                self.in_flight -= 1
+
+    def _current_hedge_delay(self) -> float:
+        """Configured hedge delay, or the p95 of recent call latencies"""
+        if self.hedge_delay > 0:
+            return self.hedge_delay
+        if len(self._latencies) < self.hedge_min_samples:
+            # Not enough data yet - effectively no hedging
+            return self.timeout
+        return self._percentile(0.95)
+
+    def _percentile(self, fraction: float) -> float:
+        """Percentile of the recorded latencies (seconds)"""
+        if not self._latencies:
+            return 0.0
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Jittered exponential backoff, or the server's Retry-After"""
+        server_delay = retry_after(error)
+        if server_delay is not None:
+            return server_delay
+        return random.uniform(0, self.retry_base_delay * (2 ** (attempt - 1)))
+
+    def stats(self) -> dict:
+        """Return call, retry, timeout and hedging counters"""
+        return {
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "p50_latency": round(self._percentile(0.5), 3),
+            "p95_latency": round(self._percentile(0.95), 3)
+        }
@@ -1,27 +1,177 @@
-from groq import Groq
-from typing import List
+from typing import AsyncIterator, List, Optional
+import asyncio
+import re
 import time
 
 from ..models.search import SearchResult
 from ..config.settings import settings
+from .cache import TTLCache, normalize_query
+from .semantic_cache import SemanticAnswerCache
+from .llm_client import LLMClient
+from .context_builder import ContextBuilder, TokenCounter
+
+# Inline citations such as [1] or [1, 3]
+CITATION_PATTERN = re.compile(r"\[(\d+(?:\s*,\s*\d+)*)\]")
+
+
+def remap_citations(answer: str, cited_pmids: List[str], pmids: List[str]) -> Optional[str]:
+    """
+    Renumber the position-based citations of an answer for another context
+
+    Args:
+        answer: Answer whose [n] refers to cited_pmids[n - 1]
+        cited_pmids: Context PMIDs the answer was generated from, in order
+        pmids: Context PMIDs of the current request, in order
+
+    Returns:
+        The answer with [n] pointing into pmids, or None if it cites a
+        paper that is not in the current context
+    """
+    positions = {pmid: index for index, pmid in enumerate(pmids, 1)}
+    unmappable = False
+
+    def renumber(match):
+        nonlocal unmappable
+        numbers = []
+        for number in match.group(1).split(","):
+            index = int(number) - 1
+            pmid = cited_pmids[index] if 0 <= index < len(cited_pmids) else None
+            if pmid not in positions:
+                unmappable = True
+                return match.group(0)
+            numbers.append(str(positions[pmid]))
+        return "[" + ", ".join(numbers) + "]"
+
+    remapped = CITATION_PATTERN.sub(renumber, answer)
+    return None if unmappable else remapped
+
 
 class LLMService:
     """Service for handling LLM-based answer generation using Groq API"""
     
     def __init__(self):
-        """Initialize Groq client"""
+        """Initialize async Groq client"""
         if not settings.GROQ_API_KEY:
             raise ValueError("GROQ_API_KEY is not set in environment variables")
-        
-        self.client = Groq(api_key=settings.GROQ_API_KEY)
+
+        from groq import AsyncGroq
+
+        # Retries are handled by LLMClient, not the SDK
+        self.client = AsyncGroq(
+            api_key=settings.GROQ_API_KEY,
+            timeout=settings.LLM_TIMEOUT,
+            max_retries=0
+        )
+        self.llm_client = LLMClient(
+            self.client,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            timeout=settings.LLM_TIMEOUT,
+            max_retries=settings.LLM_MAX_RETRIES,
+            retry_base_delay=settings.LLM_RETRY_BASE_DELAY,
+            hedge_enabled=settings.LLM_HEDGE_ENABLED,
+            hedge_delay=settings.LLM_HEDGE_DELAY
+        )
         self.model = settings.GROQ_MODEL
+        # Packs papers into a token-budgeted prompt context
+        self.context_builder = ContextBuilder(
+            token_budget=settings.CONTEXT_TOKEN_BUDGET,
+            min_tokens_per_paper=settings.CONTEXT_MIN_TOKENS_PER_PAPER,
+            counter=TokenCounter(settings.CONTEXT_TOKENIZER, settings.TOKENIZER_CACHE_DIR)
+        )
+        # Answers keyed by query + context papers + generation settings
+        self.answer_cache = TTLCache(
+            max_size=settings.ANSWER_CACHE_SIZE,
+            ttl=settings.ANSWER_CACHE_TTL
+        )
+        # Answers for near-duplicate questions (matched by query embedding)
+        self.semantic_cache = SemanticAnswerCache(
+            max_size=settings.SEMANTIC_CACHE_SIZE if settings.SEMANTIC_CACHE_ENABLED else 0,
+            ttl=settings.SEMANTIC_CACHE_TTL,
+            min_similarity=settings.SEMANTIC_CACHE_MIN_SIMILARITY,
+            min_overlap=settings.SEMANTIC_CACHE_MIN_OVERLAP
+        )
         print(f"LLm Service initialized with model: {self.model}")
 
-    def generate_answer(
+    def _cache_key(self, query: str, papers: List[SearchResult]) -> tuple:
+        """Answer cache key: normalized query, ordered context PMIDs, model and settings"""
+        return (
+            normalize_query(query),
+            tuple(paper.pmid for paper in papers),
+            self.model,
+            settings.GROQ_TEMPERATURE,
+            settings.GROQ_MAX_TOKENS
+        )
+
+    def _semantic_scope(self, max_papers: int) -> tuple:
+        """Semantic cache scope: answers are only reused for the same model, settings and paper count"""
+        return (self.model, settings.GROQ_TEMPERATURE, settings.GROQ_MAX_TOKENS, max_papers)
+
+    def _cached_answer(
+        self,
+        key: tuple,
+        papers: List[SearchResult],
+        max_papers: int,
+        query_vector: Optional[List[float]],
+        start_time: float
+    ) -> dict:
+        """
+        Return a copy of an exact or semantically matching cached answer, or None
+
+        A semantic match was generated from a different context, so its
+        citations are renumbered to the current papers; a match citing a
+        paper that isn't in the current context is not used.
+        """
+        cached = self.answer_cache.get(key)
+        if cached is None and query_vector is not None:
+            pmids = [paper.pmid for paper in papers]
+
+            def adapt(value, cited_pmids):
+                answer = remap_citations(value["answer"], cited_pmids, pmids)
+                return None if answer is None else {**value, "answer": answer}
+
+            cached = self.semantic_cache.get(
+                query_vector,
+                pmids,
+                scope=self._semantic_scope(max_papers),
+                adapt=adapt
+            )
+        if cached is None:
+            return None
+        return {
+            **cached,
+            "generation_time": round(time.time() - start_time, 3),
+            "cached": True
+        }
+
+    def _store_answer(
+        self,
+        key: tuple,
+        papers: List[SearchResult],
+        max_papers: int,
+        query_vector: Optional[List[float]],
+        result: dict
+    ):
+        """Put a generated answer in the exact and semantic caches"""
+        self.answer_cache.set(key, result)
+        if query_vector is not None:
+            self.semantic_cache.set(
+                query_vector,
+                [paper.pmid for paper in papers],
+                result,
+                scope=self._semantic_scope(max_papers)
+            )
+
+    def clear_caches(self):
+        """Drop all cached answers (e.g. after the index changed)"""
+        self.answer_cache.clear()
+        self.semantic_cache.clear()
+
+    async def generate_answer(
         self,
         query: str,
         papers: List[SearchResult],
-        max_papers: int = 5
+        max_papers: int = 5,
+        query_vector: Optional[List[float]] = None
     ) -> dict:
         """
         Generate an AI answer based on retrieved papers
@@ -30,32 +180,24 @@ class LLMService:
             query: User's search query/question
             papers: List of retrieved SearchResult objects
             max_papers: Maximum number of papers to include in context
+            query_vector: Query embedding; enables the semantic answer cache
         
         Returns:
             dict with 'answer', 'model', 'tokens_used', 'generation_time'
+            and 'cached'
         """
         start_time = time.time()
 
-        try:
-            # Build context from papers
-            context = self._build_context(papers[:max_papers])
-
-            # create the prompt
-            prompt = self._create_prompt(query, context, len(papers[:max_papers]))
+        cache_key = self._cache_key(query, papers[:max_papers])
+        cached = self._cached_answer(cache_key, papers[:max_papers], max_papers, query_vector, start_time)
+        if cached is not None:
+            return cached
 
+        try:
             # Call groq API
-            response = self.client.chat.completions.create(
+            response = await self.llm_client.create(
                 model = self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful medical research assistant. Your task is to answer questions based on provided research papers. Always cite sources using [1], [2], etc. Be accurate and concise."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=self._build_messages(query, papers[:max_papers]),
                 temperature=settings.GROQ_TEMPERATURE,
                 max_tokens=settings.GROQ_MAX_TOKENS,
                 top_p=1,
@@ -70,27 +212,122 @@ class LLMService:
 
             print(f"Generated answer in {generation_time: 2f}s using {tokens_used} tokens")
 
-            return {
+            result = {
                 "answer": answer,
                 "model": self.model,
                 "tokens_used": tokens_used,
-                "generation_time": round(generation_time, 3)
+                "generation_time": round(generation_time, 3),
+                "cached": False
             }
+            self._store_answer(cache_key, papers[:max_papers], max_papers, query_vector, result)
+            return result
         
         except Exception as e:
             print(f"LLM generation errro: {e}")
             # Return a fallback message instead of crashing
-            return {
-                "answer": f"I apologize, but I encountered an error generating an answer: {str(e)}. Please try rephrasing your question or contact suppor if the issue persists.",
+            return self._error_response(e, start_time)
+
+    async def stream_answer(
+        self,
+        query: str,
+        papers: List[SearchResult],
+        max_papers: int = 5,
+        query_vector: Optional[List[float]] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Generate an AI answer, yielding tokens as they arrive
+
+        Args:
+            query: User's search query/question
+            papers: List of retrieved SearchResult objects
+            max_papers: Maximum number of papers to include in context
+            query_vector: Query embedding; enables the semantic answer cache
+
+        Yields:
+            {'type': 'token', 'content': str} for each piece of the answer,
+            then one {'type': 'done', ...} with the same fields as
+            generate_answer() returns
+        """
+        start_time = time.time()
+        parts = []
+        tokens_used = 0
+
+        cache_key = self._cache_key(query, papers[:max_papers])
+        cached = self._cached_answer(cache_key, papers[:max_papers], max_papers, query_vector, start_time)
+        if cached is not None:
+            yield {"type": "token", "content": cached["answer"]}
+            yield {"type": "done", **cached}
+            return
+
+        try:
+            stream = self.llm_client.stream(
+                model=self.model,
+                messages=self._build_messages(query, papers[:max_papers]),
+                temperature=settings.GROQ_TEMPERATURE,
+                max_tokens=settings.GROQ_MAX_TOKENS,
+                top_p=1
+            )
+
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    content = chunk.choices[0].delta.content
+                    parts.append(content)
+                    yield {"type": "token", "content": content}
+
+                # Groq reports usage on the final chunk (x_groq.usage)
+                usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None)
+                if usage:
+                    tokens_used = usage.total_tokens
+
+            generation_time = time.time() - start_time
+            print(f"Streamed answer in {generation_time: 2f}s using {tokens_used} tokens")
+
+            result = {
+                "answer": "".join(parts),
                 "model": self.model,
-                "tokens_used": 0,
-                "generation_time": round(time.time() - start_time, 3),
-                "error": str(e)
+                "tokens_used": tokens_used,
+                "generation_time": round(generation_time, 3),
+                "cached": False
             }
+            self._store_answer(cache_key, papers[:max_papers], max_papers, query_vector, result)
+            yield {"type": "done", **result}
+
+        except Exception as e:
+            print(f"LLM streaming error: {e}")
+            yield {"type": "done", **self._error_response(e, start_time)}
+
+    def _build_messages(self, query: str, papers: List[SearchResult]) -> List[dict]:
+        """Build the chat messages (system + prompt with paper context)"""
+        # Build context from papers
+        context = self._build_context(papers)
+
+        # create the prompt
+        prompt = self._create_prompt(query, context, len(papers))
+
+        return [
+            {
+                "role": "system",
+                "content": "You are a helpful medical research assistant. Your task is to answer questions based on provided research papers. Always cite sources using [1], [2], etc. Be accurate and concise."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+
+    def _error_response(self, error: Exception, start_time: float) -> dict:
+        """Fallback answer returned instead of raising when generation fails"""
+        return {
+            "answer": f"I apologize, but I encountered an error generating an answer: {str(error)}. Please try rephrasing your question or contact suppor if the issue persists.",
+            "model": self.model,
+            "tokens_used": 0,
+            "generation_time": round(time.time() - start_time, 3),
+            "error": str(error)
+        }
         
     def _build_context(self, papers: List[SearchResult]) -> str:
         """
-        Format papers into context string for LLM
+        Format papers into context string for LLM (within CONTEXT_TOKEN_BUDGET)
         
         Args:
             papers: List of SearchResult objects
@@ -98,21 +335,7 @@ class LLMService:
         Returns:
             Formatted context string
         """
-        context_parts = []
-
-        for i, paper in enumerate(papers, 1):
-            # Truncate abstract if too long (first 600 chars)
-            abstract = paper.abstract[:600] + "..." if len(paper.abstract) > 600 else paper.abstract
-
-            paper_text = f"""[{i}] Title: {paper.title}
-Journal: {paper.journal or 'N/A'} ({paper.year or 'N/A'})
-PMID: {paper.pmid or 'N/A'}
-Abstract: {abstract}
-Relevance Score: {paper.score:.3f} if paper.score is not None else "Relevance Score: N/A"
-"""
-            context_parts.append(paper_text)
-        
-        return "\n---\n".join(context_parts)
+        return self.context_builder.build(papers)
     
     def _create_prompt(self, query: str, context: str, num_papers: int) -> str:
         """
@@ -145,7 +368,7 @@ INSTRUCTIONS:
 Please provide your answer now:"""
         return prompt
 
-    def test_connection(self) -> bool:
+    async def test_connection(self) -> bool:
         """
         Test if Groq API is accessible
         
@@ -153,7 +376,7 @@ Please provide your answer now:"""
             True if connection successful, False otherwise
         """
         try:
-            response = self.client.chat.completions.create(
+            response = await self.llm_client.create(
                 model=self.model,
                 messages=[{"role": "user", "content": "Test"}],
                 max_tokens=10
@@ -167,12 +390,15 @@ Please provide your answer now:"""
 # Global instance (will be initialized when app starts)
 llm_service = None
 
-def initialize_llm_service():
+async def initialize_llm_service():
     """Initialize the global LLM service instance"""
     global llm_service
     try:
         llm_service = LLMService()
-        llm_service.test_connection()
+        # Tokenizer file is read off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, llm_service.context_builder.counter.load)
+        if settings.LLM_STARTUP_CHECK:
+            await llm_service.test_connection()
         return llm_service
     except Exception as e:
         print(f"Failed to initialize LLM service: {e}")
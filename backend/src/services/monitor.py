@@ -0,0 +1,108 @@
+from typing import Optional
+import asyncio
+import time
+
+from ..config.settings import settings
+from .search_service import search_service
+from .llm_service import get_llm_service
+
+
+class HealthMonitor:
+    """
+    Background task keeping a snapshot of backend health
+
+    Weaviate connectivity, the document count and LLM availability are
+    refreshed every HEALTH_MONITOR_INTERVAL seconds (every second while the
+    search service is still warming up). Health and stats endpoints serve
+    the snapshot, so probes cost nothing and never wait on a backend.
+    """
+
+    def __init__(self, interval: float, probe_timeout: float):
+        """
+        Args:
+            interval: Seconds between refreshes
+            probe_timeout: Upper bound on each individual probe
+        """
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self.snapshot: Optional[dict] = None
+        self._checked_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the refresh loop on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    @property
+    def snapshot_age(self) -> Optional[float]:
+        """Seconds since the last refresh (None before the first one)"""
+        if self._checked_at is None:
+            return None
+        return round(time.monotonic() - self._checked_at, 3)
+
+    async def _run(self):
+        """Refresh the snapshot until cancelled"""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Health monitor refresh failed: {e}")
+
+            interval = self.interval if search_service.is_ready else min(self.interval, 1.0)
+            await asyncio.sleep(interval)
+
+    async def refresh(self):
+        """Probe Weaviate and the LLM service and store the results"""
+        weaviate_connected = await search_service.is_connected()
+
+        total_documents = None
+        if weaviate_connected:
+            try:
+                total_documents = await asyncio.wait_for(
+                    search_service.get_total_documents(),
+                    self.probe_timeout
+                )
+            except asyncio.TimeoutError:
+                pass
+        if total_documents is None and self.snapshot:
+            # Keep the last known count rather than reporting zero
+            total_documents = self.snapshot["total_documents"]
+
+        llm_service = get_llm_service()
+        llm_connected = llm_service is not None
+        if llm_service and settings.HEALTH_MONITOR_PROBE_LLM:
+            llm_connected = await self._probe_llm(llm_service)
+
+        self.snapshot = {
+            "weaviate_connected": weaviate_connected,
+            "total_documents": total_documents or 0,
+            "llm_connected": llm_connected,
+            "llm_model": llm_service.model if llm_service else None
+        }
+        self._checked_at = time.monotonic()
+
+    async def _probe_llm(self, llm_service) -> bool:
+        """Check the Groq API is reachable (model listing, no tokens used)"""
+        try:
+            await asyncio.wait_for(llm_service.client.models.list(), self.probe_timeout)
+            return True
+        except Exception:
+            return False
+
+    async def close(self):
+        """Stop the refresh loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global instance (started with the app lifespan)
+health_monitor = HealthMonitor(
+    interval=settings.HEALTH_MONITOR_INTERVAL,
+    probe_timeout=settings.HEALTH_CHECK_TIMEOUT
+)
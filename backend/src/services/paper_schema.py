@@ -0,0 +1,174 @@
+from typing import Any, Optional
+import hashlib
+import json
+import re
+
+# Imported by the API as well, so weaviate is only imported where needed.
+
+# Integer copy of the (TEXT) year property, range-indexed so year filters
+# run on the index instead of comparing strings
+YEAR_INT_PROPERTY = "year_int"
+
+YEAR_PATTERN = re.compile(r"\b(1[5-9]\d{2}|2\d{3})\b")
+
+# Hashes compared by delta syncs: content_hash changes with any stored
+# field, text_hash only with the embedded text (a paper whose text_hash is
+# unchanged keeps its vector)
+CONTENT_HASH_PROPERTY = "content_hash"
+CONTENT_HASH_FIELDS = ("title", "abstract", "journal", "year")
+TEXT_HASH_PROPERTY = "text_hash"
+TEXT_HASH_FIELDS = ("title", "abstract")
+
+# Namespace of the deterministic paper ids, see paper_uuid()
+PAPER_UUID_NAMESPACE = "MedicalPaper"
+
+
+def parse_year(value: Any) -> Optional[int]:
+    """
+    Publication year as an integer
+
+    Accepts ints and strings such as "2021" or "2021 Mar"; returns None
+    for missing or unparseable values ("Unknown", "").
+    """
+    if isinstance(value, int):
+        return value
+    match = YEAR_PATTERN.search(str(value or ""))
+    return int(match.group(1)) if match else None
+
+
+def paper_uuid(pmid: Any) -> str:
+    """
+    Deterministic object id of a paper, derived from its PMID
+
+    The same paper always maps to the same id, so uploads are idempotent
+    upserts and existence checks are id lookups instead of scans.
+    """
+    from weaviate.util import generate_uuid5
+
+    return generate_uuid5(str(pmid), PAPER_UUID_NAMESPACE)
+
+
+def content_hash(properties: dict, fields: tuple = CONTENT_HASH_FIELDS) -> str:
+    """
+    SHA-256 of the given fields of a paper's properties
+
+    Computed on stored properties (paper_properties output or objects read
+    back from Weaviate), so both sides of a comparison are normalized alike.
+    """
+    content = json.dumps([properties.get(field) for field in fields], ensure_ascii=False)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def text_hash(properties: dict) -> str:
+    """SHA-256 of the text the embedding is computed from (title, abstract)"""
+    return content_hash(properties, TEXT_HASH_FIELDS)
+
+
+def paper_properties(paper: dict) -> dict:
+    """Weaviate properties for a collected paper"""
+    properties = {
+        "title": paper["title"],
+        "abstract": paper["abstract"],
+        "pmid": paper.get("pmid", ""),
+        "journal": paper.get("journal", ""),
+        "year": paper.get("year", "Unknown"),
+        YEAR_INT_PROPERTY: parse_year(paper.get("year"))
+    }
+    properties[CONTENT_HASH_PROPERTY] = content_hash(properties)
+    properties[TEXT_HASH_PROPERTY] = text_hash(properties)
+    return properties
+
+
+def year_int_property():
+    """Schema definition of the integer year property"""
+    from weaviate.classes.config import Property, DataType
+
+    return Property(
+        name=YEAR_INT_PROPERTY,
+        data_type=DataType.INT,
+        description="Publication year as an integer (range filters)",
+        index_filterable=True,
+        index_range_filters=True
+    )
+
+
+def content_hash_property():
+    """Schema definition of the content hash property"""
+    return _hash_property(CONTENT_HASH_PROPERTY, "SHA-256 of title, abstract, journal and year (delta sync)")
+
+
+def text_hash_property():
+    """Schema definition of the embedded text hash property"""
+    return _hash_property(TEXT_HASH_PROPERTY, "SHA-256 of title and abstract (delta sync)")
+
+
+def _hash_property(name: str, description: str):
+    from weaviate.classes.config import Property, DataType, Tokenization
+
+    return Property(
+        name=name,
+        data_type=DataType.TEXT,
+        description=description,
+        index_filterable=True,
+        index_searchable=False,
+        tokenization=Tokenization.FIELD
+    )
+
+
+def paper_collection_properties() -> list:
+    """Full property list of the paper collection"""
+    from weaviate.classes.config import Property, DataType
+
+    return [
+        Property(name="title", data_type=DataType.TEXT, description="Paper title"),
+        Property(name="abstract", data_type=DataType.TEXT, description="Paper abstract content"),
+        Property(name="pmid", data_type=DataType.TEXT, description="PubMed ID"),
+        Property(name="journal", data_type=DataType.TEXT, description="Journal name"),
+        Property(name="year", data_type=DataType.TEXT, description="Publication year as collected"),
+        year_int_property(),
+        content_hash_property(),
+        text_hash_property(),
+    ]
+
+
+def create_paper_collection(client, name: str) -> None:
+    """Create the paper collection with its full schema (sync client, self-provided vectors)"""
+    from weaviate.classes.config import Configure
+
+    client.collections.create(
+        name=name,
+        description="Medical research papers and abstracts",
+        vector_config=Configure.Vectors.self_provided(),  # We provide our own embeddings
+        properties=paper_collection_properties()
+    )
+
+
+def ensure_year_int_property(collection) -> bool:
+    """
+    Add the integer year property to an existing collection (sync client)
+
+    Returns:
+        True if the property was added, False if it already existed
+    """
+    return _ensure_property(collection, year_int_property())
+
+
+def ensure_hash_properties(collection) -> bool:
+    """
+    Add the content and text hash properties to an existing collection (sync client)
+
+    Returns:
+        True if a property was added, False if both already existed
+    """
+    added_content = _ensure_property(collection, content_hash_property())
+    added_text = _ensure_property(collection, text_hash_property())
+    return added_content or added_text
+
+
+def _ensure_property(collection, prop) -> bool:
+    existing = {existing_prop.name for existing_prop in collection.config.get().properties}
+    if prop.name in existing:
+        return False
+
+    collection.config.add_property(prop)
+    return True
@@ -0,0 +1,171 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+import asyncio
+import threading
+import time
+
+from ..models.search import SearchResult
+
+
+class Reranker:
+    """
+    Cross-encoder reranking of search candidates on CPU
+
+    Scores (query, title + abstract) pairs with a small cross-encoder. The
+    pairs are sorted by length and scored in one predict() call whose
+    batches are therefore length buckets, padded only to their own longest
+    pair. If scoring doesn't finish within the latency budget the original
+    order is kept.
+
+    Scoring runs on a single thread, so work is bounded: a request that
+    times out cancels its pass if it hasn't started yet, and while one pass
+    is already waiting behind the running one new requests fall back
+    immediately instead of queueing.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 16, max_length: int = 256):
+        """
+        Args:
+            model_name: Sentence-transformers cross-encoder model
+            batch_size: Pairs per length bucket
+            max_length: Maximum tokens per (query, paper) pair
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.model = None
+        # Own thread so reranking never delays query encoding
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+
+        # Passes submitted to the reranker thread and not finished yet
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+        self.calls = 0
+        self.fallbacks = 0
+        self.skipped = 0
+        self.cancelled = 0
+        self.total_time = 0.0
+
+    def load(self):
+        """Load the cross-encoder (blocking)"""
+        if self.model is None:
+            from sentence_transformers import CrossEncoder
+
+            print(f"Loading reranker model {self.model_name}...")
+            self.model = CrossEncoder(self.model_name, device="cpu", max_length=self.max_length)
+            print("Reranker model loaded successfully.")
+        return self.model
+
+    async def warm_up(self):
+        """Load the model on the reranker thread without blocking the loop"""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.load)
+
+    async def rerank(
+        self,
+        query: str,
+        results: List[SearchResult],
+        top_k: int,
+        budget_ms: float
+    ) -> Tuple[List[SearchResult], bool]:
+        """
+        Reorder results by cross-encoder score
+
+        Args:
+            query: Search query
+            results: Candidates in first-stage order
+            top_k: Number of results to return
+            budget_ms: Latency budget; on overrun the first-stage order is used
+
+        Returns:
+            Tuple of (top top_k results, whether they were reranked). Reranked
+            results carry the cross-encoder probability as score.
+        """
+        if len(results) < 2:
+            return results[:top_k], True
+
+        start_time = time.perf_counter()
+        future = self._submit(query, results)
+        if future is None:
+            # One pass is running and another already waits for it
+            self.fallbacks += 1
+            self.skipped += 1
+            return results[:top_k], False
+
+        try:
+            scores = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), budget_ms / 1000)
+        except asyncio.TimeoutError:
+            # A queued pass is dropped; a running forward pass can't be
+            # interrupted and finishes in the background
+            if future.cancel():
+                self.cancelled += 1
+            self.fallbacks += 1
+            print(f"Rerank exceeded {budget_ms:.0f}ms budget - using first-stage order")
+            return results[:top_k], False
+        except Exception as e:
+            self.fallbacks += 1
+            print(f"Rerank failed ({e}) - using first-stage order")
+            return results[:top_k], False
+
+        self.calls += 1
+        self.total_time += time.perf_counter() - start_time
+
+        ranked = sorted(zip(scores, range(len(results))), key=lambda pair: -pair[0])
+        reranked = [
+            results[i].model_copy(update={"score": float(score)})
+            for score, i in ranked[:top_k]
+        ]
+        return reranked, True
+
+    def _submit(self, query: str, results: List[SearchResult]) -> Optional[Future]:
+        """Queue a scoring pass, or return None if one is already waiting"""
+        with self._pending_lock:
+            if self._pending > 1:
+                return None
+            self._pending += 1
+
+        future = self._executor.submit(self._score, query, results)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future: Future):
+        with self._pending_lock:
+            self._pending -= 1
+
+    def _score(self, query: str, results: List[SearchResult]) -> List[float]:
+        """Score all pairs in length-sorted order (blocking)"""
+        import torch
+
+        model = self.load()
+        documents = [f"{result.title or ''}. {result.abstract or ''}" for result in results]
+
+        # Sort by length so each batch holds pairs of similar length
+        order = sorted(range(len(documents)), key=lambda i: len(documents[i]))
+        sorted_scores = model.predict(
+            [(query, documents[i]) for i in order],
+            batch_size=self.batch_size,
+            activation_fn=torch.nn.Sigmoid(),
+            show_progress_bar=False
+        )
+
+        scores = [0.0] * len(documents)
+        for position, i in enumerate(order):
+            scores[i] = float(sorted_scores[position])
+        return scores
+
+    def stats(self) -> dict:
+        """Return rerank call and fallback counters"""
+        return {
+            "model": self.model_name,
+            "loaded": self.model is not None,
+            "calls": self.calls,
+            "fallbacks": self.fallbacks,
+            "skipped": self.skipped,
+            "cancelled": self.cancelled,
+            "pending": self._pending,
+            "avg_time_ms": round(self.total_time / self.calls * 1000, 3) if self.calls else 0.0
+        }
+
+    def close(self):
+        """Stop the reranker thread"""
+        self._executor.shutdown(wait=False)
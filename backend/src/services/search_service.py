@@ -1,55 +1,169 @@
-import weaviate
-from sentence_transformers import SentenceTransformer
-from weaviate.classes.query import MetadataQuery
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Callable, Optional
+import asyncio
+import base64
 import time
+import uuid
 
-from ..models.search import SearchResult, SearchMode
+from ..models.search import SearchResult, SearchMode, FusionMethod, SearchFilters
 from ..config.settings import settings
+from .cache import TTLCache, normalize_query
+from .batching import BatchingEncoder
+from .reranker import Reranker
+from .fusion import Hit, reciprocal_rank_fusion, relative_score_fusion
+from .vector_backends import VectorBackend, UnsupportedSearchError, create_backend
+
+# torch/sentence-transformers and weaviate are imported lazily so that
+# importing this module (and starting the API) stays fast.
+
+
+class ServiceNotReadyError(Exception):
+    """Raised when a search arrives before the service has warmed up"""
+
+
+class InvalidCursorError(ValueError):
+    """Raised for malformed, unknown or expired page cursors"""
+
 
 class SearchService:
-    """Service for handling serach operations with weaviate"""
+    """Service for handling serach operations with weaviate (or the embedded index)"""
 
-    def __init__(self):
-        self.client = None
+    def __init__(self, backend: Optional[VectorBackend] = None):
+        self.backend = backend or create_backend()
         self.model = None
-        self.collection = None
-        self._initialize()
+        self.embedding_cache = TTLCache(
+            max_size=settings.EMBEDDING_CACHE_SIZE,
+            ttl=settings.EMBEDDING_CACHE_TTL
+        )
+        self.result_cache = TTLCache(
+            max_size=settings.RESULT_CACHE_SIZE,
+            ttl=settings.RESULT_CACHE_TTL
+        )
+        # bm25 / near_vector hits per query, reused by every search mode
+        self.leg_cache = TTLCache(
+            max_size=settings.LEG_CACHE_SIZE,
+            ttl=settings.LEG_CACHE_TTL
+        )
+        # Candidate sets (object id, score) behind page cursors
+        self.page_sessions = TTLCache(
+            max_size=settings.PAGINATION_MAX_SESSIONS,
+            ttl=settings.PAGINATION_CURSOR_TTL
+        )
+        # Index generation seen last; a change invalidates cached results
+        self.index_generation = 0
+        self._generation_checked_at = 0.0
+        self._invalidation_listeners: List[Callable[[], None]] = []
+        # Dedicated pool for CPU-bound encoding so it never runs on the event loop
+        self._encode_executor = ThreadPoolExecutor(
+            max_workers=settings.ENCODER_WORKERS,
+            thread_name_prefix="encoder"
+        )
+        # Groups concurrent query encodes into batched model calls
+        self.batch_encoder = BatchingEncoder(
+            encode_batch=self._encode_texts,
+            executor=self._encode_executor,
+            max_batch_size=settings.ENCODE_BATCH_MAX_SIZE,
+            max_wait_ms=settings.ENCODE_BATCH_MAX_WAIT_MS,
+            max_concurrent_batches=settings.ENCODER_WORKERS
+        )
+        # Optional second-stage cross-encoder (model loaded on first use)
+        self.reranker = Reranker(
+            model_name=settings.RERANK_MODEL,
+            batch_size=settings.RERANK_BATCH_SIZE,
+            max_length=settings.RERANK_MAX_LENGTH
+        )
+        # Lifecycle state
+        self.startup_error: Optional[str] = None
+        self._warmup_task: Optional[asyncio.Task] = None
 
-    def _initialize(self):
-        """Initialize Weaviate client and embedding model"""
-        try:
-            # Connect to Weaviate
-            self.client = weaviate.connect_to_local(
-                host=settings.WEAVIATE_HOST,
-                port=settings.WEAVIATE_PORT
-            )
+    @property
+    def encoder_ready(self) -> bool:
+        """Whether the embedding model is loaded and warm"""
+        return self.model is not None
 
-            # Load embedding model
-            print("Loading embedding model...")
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            print("Embedding model loaded successfully.")
+    @property
+    def is_ready(self) -> bool:
+        """Whether the service can answer searches"""
+        return self.model is not None and self.backend.connected
+
+    def start(self):
+        """
+        Start background warm-up (model load + backend connect)
+
+        Must be called from the running event loop. Returns immediately;
+        readiness is reported by is_ready.
+        """
+        if self._warmup_task is None:
+            self._warmup_task = asyncio.create_task(self._warm_up())
 
-            # Get Collection 
-            self.collection = self.client.collections.get("MedicalPaper")
-            
-            print("Weaviate connection established successfully.")
+    async def _warm_up(self):
+        """Load the encoder and connect the vector backend concurrently"""
+        await asyncio.gather(self._load_model(), self._connect_with_retry())
+        print("Search service ready.")
+
+        if settings.RERANK_PRELOAD:
+            try:
+                await self.reranker.warm_up()
+            except Exception as e:
+                # Reranking falls back to first-stage order; search still works
+                print(f"Failed to load reranker model: {e}")
+
+    async def _load_model(self):
+        """Load and warm the embedding model on the encoder executor"""
+        try:
+            loop = asyncio.get_running_loop()
+            self.model = await loop.run_in_executor(self._encode_executor, self._load_encoder)
         except Exception as e:
-            print(f"Error initializing search servie: {e}")
-            raise
-    
-    def is_connected(self) -> bool:
-        """Check if Weaviate is connected"""
+            self.startup_error = f"Failed to load embedding model: {e}"
+            print(self.startup_error)
+
+    def _load_encoder(self):
+        """Load the embedding model and run one encode to warm it (blocking)"""
+        from .encoders import load_encoder, check_parity
+
+        print(f"Loading embedding model ({settings.ENCODER_BACKEND} backend)...")
+        model = load_encoder()
+        model.encode("warm up")
+        print("Embedding model loaded successfully.")
+
+        if settings.ENCODER_PARITY_CHECK and settings.ENCODER_BACKEND != "torch":
+            parity = check_parity(model)
+            print(f"Encoder parity vs fp32: mean cosine {parity['mean_cosine']}, min {parity['min_cosine']}")
+
+        return model
+
+    async def _connect_with_retry(self):
+        """Connect the backend, retrying in the background until it is up"""
+        while True:
+            try:
+                await self.connect()
+                return
+            except Exception:
+                await asyncio.sleep(settings.WEAVIATE_CONNECT_RETRY_INTERVAL)
+
+    async def connect(self):
+        """Connect the vector backend (Weaviate client or embedded index)"""
+        await self.backend.connect()
+
+    async def is_connected(self) -> bool:
+        """Check if the vector backend is connected"""
+        if not self.backend.connected:
+            return False
         try:
-            return self.client.is_ready()
+            return await asyncio.wait_for(self.backend.is_ready(), settings.HEALTH_CHECK_TIMEOUT)
         except:
             return False
-        
-    def search(
+
+    async def search(
         self,
         query: str,
         mode: SearchMode = SearchMode.HYBRID,
-        limit: int = 10
+        limit: int = 10,
+        alpha: float = settings.DEFAULT_ALPHA,
+        fields: Optional[List[str]] = None,
+        rerank: bool = False,
+        fusion: Optional[FusionMethod] = None,
+        filters: Optional[SearchFilters] = None
     )  -> tuple[list[SearchResult], float]:
         """
         Perform search based on mode
@@ -58,119 +172,492 @@ class SearchService:
             query: Search query string
             mode: Search mode (hybrid, semantic, or keyword)
             limit: Number of  results to return
+            alpha: Hybrid weighting (only used in hybrid mode)
+            fields: Properties to fetch from Weaviate (default: all);
+                unselected fields are None in the results
+            rerank: Over-fetch RERANK_CANDIDATES results and reorder them
+                with the cross-encoder (falls back to the first-stage order
+                when over the latency budget)
+            fusion: Hybrid fusion method (default: HYBRID_FUSION setting)
+            filters: Year range / journal filters, applied by Weaviate
 
         Returns:
             Tuple of (results list, search time in seconds)
         """
+        if not self.is_ready:
+            raise ServiceNotReadyError(self.startup_error or "Search service is warming up")
+
+        self._check_supported(mode)
+
         start_time = time.time()
+        fusion = fusion or FusionMethod(settings.HYBRID_FUSION)
 
         try:
+            await self._refresh_index_generation()
+
+            fields = sorted(set(fields)) if fields else None
+            cache_key = (
+                normalize_query(query),
+                mode,
+                limit,
+                (alpha, fusion) if mode == SearchMode.HYBRID else None,
+                tuple(fields) if fields else None,
+                rerank,
+                filters
+            )
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return list(cached), time.time() - start_time
+
+            # The cross-encoder needs title and abstract of every candidate
+            fetch_limit = max(limit, settings.RERANK_CANDIDATES) if rerank else limit
+            fetch_fields = None if rerank else fields
+
             if mode == SearchMode.SEMANTIC:
-                results = self._semantic_search(query, limit)
+                results = await self._semantic_search(query, fetch_limit, fetch_fields, filters)
             elif mode == SearchMode.KEYWORD:
-                results = self._keyword_search(query, limit)
+                results = await self._keyword_search(query, fetch_limit, fetch_fields, filters)
             else:
-                results = self._hybrid_search(query, limit)
-            
-            search_time = time.time() - start_time
+                results = await self._hybrid_search(query, fetch_limit, alpha, fetch_fields, fusion, filters)
 
             # convert to SearchResult models
-            search_results = self._format_results(results)
+            search_results = self._format_results(results, fetch_fields)
+            cacheable = True
+            if rerank:
+                search_results, cacheable = await self.reranker.rerank(
+                    query,
+                    search_results,
+                    top_k=limit,
+                    budget_ms=settings.RERANK_LATENCY_BUDGET_MS
+                )
+
+            search_time = time.time() - start_time
+            # A budget fallback isn't cached so the next request gets reranked
+            if cacheable:
+                self.result_cache.set(cache_key, search_results)
+
+            return list(search_results), search_time
 
-            return search_results, search_time
-        
         except Exception as e:
             print(f"Search error: {e}")
             raise Exception(f"Search failed: {str(e)}")
-    
-    def _semantic_search(self, query: str, limit: int) -> List[Any]:
-        """Pure vector/semanitc search"""
-        query_vector = self.model.encode(query).tolist()
-
-        response = self.collection.query.near_vector(
-            near_vector=query_vector,
-            limit=limit,
-            return_metadata=MetadataQuery(distance=True)
-        )
 
-        return response.objects
-    
-    def _keyword_search(self, query: str, limit: int) -> List[Any]:
-        """BM25 keyword search"""
-        response = self.collection.query.bm25(
-            query=query,
-            limit=limit,
-            return_metadata=MetadataQuery(score=True)
+    async def _refresh_index_generation(self):
+        """
+        Re-read the index generation counter (at most every
+        INDEX_GENERATION_CHECK_INTERVAL seconds) and drop cached results
+        when the uploader has changed the index since the last check
+        """
+        now = time.monotonic()
+        if now - self._generation_checked_at < settings.INDEX_GENERATION_CHECK_INTERVAL:
+            return
+        # Set before awaiting so concurrent requests don't all re-check
+        self._generation_checked_at = now
+
+        generation = await self.backend.index_generation()
+        if generation is None or generation == self.index_generation:
+            return
+
+        print(f"Index generation changed ({self.index_generation} -> {generation}), clearing caches")
+        self.index_generation = generation
+        self.invalidate_caches()
+
+    def invalidate_caches(self):
+        """Drop cached search results and notify invalidation listeners"""
+        self.result_cache.clear()
+        self.leg_cache.clear()
+        for listener in self._invalidation_listeners:
+            listener()
+
+    def add_invalidation_listener(self, listener: Callable[[], None]):
+        """Register a callback run whenever the index changes"""
+        self._invalidation_listeners.append(listener)
+
+    async def _encode_query(self, query: str) -> List[float]:
+        """
+        Get the embedding for a query, using the embedding cache
+
+        The query is normalized (unicode, case, whitespace) before lookup so
+        trivially different spellings of the same query share one entry.
+        The embedding model is uncased, so encoding the normalized text
+        gives the same vector as the raw query. Cache misses go through the
+        micro-batching encoder.
+        """
+        key = normalize_query(query)
+        vector = self.embedding_cache.get(key)
+        if vector is None:
+            vector = await self.batch_encoder.encode(key)
+            self.embedding_cache.set(key, vector)
+        return vector
+
+    async def get_query_embedding(self, query: str) -> List[float]:
+        """Get the (cached) embedding of a query, e.g. for the semantic answer cache"""
+        if not self.is_ready:
+            raise ServiceNotReadyError(self.startup_error or "Search service is warming up")
+        return await self._encode_query(query)
+
+    def _encode_texts(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """Run the embedding model on a batch of texts (blocking)"""
+        return self.model.encode(texts, batch_size=batch_size or len(texts)).tolist()
+
+    async def prefetch_embeddings(self, queries: List[str]) -> int:
+        """
+        Encode all uncached queries with one batched model call
+
+        Used by batch search so that the individual searches afterwards hit
+        the embedding cache instead of encoding one query at a time.
+
+        Returns:
+            Number of queries that were encoded
+        """
+        if not self.is_ready:
+            raise ServiceNotReadyError(self.startup_error or "Search service is warming up")
+
+        keys = [
+            key for key in dict.fromkeys(normalize_query(query) for query in queries)
+            if self.embedding_cache.get(key) is None
+        ]
+        if not keys:
+            return 0
+
+        loop = asyncio.get_running_loop()
+        vectors = await loop.run_in_executor(
+            self._encode_executor,
+            self._encode_texts,
+            keys,
+            settings.ENCODE_BATCH_MAX_SIZE
         )
-            
-        return response.objects
-    
-    def _hybrid_search(self, query: str, limit: int, alpha: float = 0.7) -> List[Any]:
+        for key, vector in zip(keys, vectors):
+            self.embedding_cache.set(key, vector)
+        return len(keys)
+
+    async def _semantic_search(
+        self,
+        query: str,
+        limit: int,
+        fields: Optional[List[str]] = None,
+        filters: Optional[SearchFilters] = None
+    ) -> List[Hit]:
+        """Pure vector/semanitc search (cached as the vector leg)"""
+        return await self._cached_leg("vector", query, limit, fields, filters, self._vector_leg)
+
+    async def _keyword_search(
+        self,
+        query: str,
+        limit: int,
+        fields: Optional[List[str]] = None,
+        filters: Optional[SearchFilters] = None
+    ) -> List[Hit]:
+        """BM25 keyword search (cached as the keyword leg)"""
+        return await self._cached_leg("keyword", query, limit, fields, filters, self._keyword_leg)
+
+    async def _hybrid_search(
+        self,
+        query: str,
+        limit: int,
+        alpha: float = settings.DEFAULT_ALPHA,
+        fields: Optional[List[str]] = None,
+        fusion: FusionMethod = FusionMethod.RELATIVE_SCORE,
+        filters: Optional[SearchFilters] = None
+    ) -> List[Hit]:
         """
         Hybrid search combining semantic + keyword
         alpha = 0.7 mean 70% semantic, 30% keyword
-        """
 
-        query_vector = self.model.encode(query).tolist()
+        Unless fusion is SERVER, bm25 and near_vector run concurrently
+        (each leg fetching FUSION_LEG_CANDIDATES and going through the leg
+        cache) and are fused here with RRF or relative score fusion.
+        Backends without keyword search only contribute the vector leg.
+        """
+        if not self.backend.supports_keyword:
+            alpha = 1.0
+        elif fusion == FusionMethod.SERVER:
+            return await self._server_hybrid_search(query, limit, alpha, fields, filters)
 
-        response = self.collection.query.hybrid(
-            query = query,
-            vector=query_vector,
-            alpha=alpha,
-            limit=limit,
-            return_metadata=MetadataQuery(score=True)
+        leg_limit = max(limit, settings.FUSION_LEG_CANDIDATES)
+        # A zero-weight leg can't change the order, so it isn't queried
+        vector_hits, keyword_hits = await asyncio.gather(
+            self._semantic_search(query, leg_limit, fields, filters) if alpha > 0 else self._no_hits(),
+            self._keyword_search(query, leg_limit, fields, filters) if alpha < 1 else self._no_hits()
         )
 
-        return response.objects
-    
-    def _format_results(self, results: List[Any]) -> List[SearchResult]:
-        """Format Weaviate results to searchresult models"""
+        if fusion == FusionMethod.RRF:
+            fused = reciprocal_rank_fusion(vector_hits, keyword_hits, alpha, k=settings.RRF_K)
+        else:
+            fused = relative_score_fusion(vector_hits, keyword_hits, alpha)
+        return fused[:limit]
+
+    async def _server_hybrid_search(
+        self,
+        query: str,
+        limit: int,
+        alpha: float,
+        fields: Optional[List[str]] = None,
+        filters: Optional[SearchFilters] = None
+    ) -> List[Hit]:
+        """Weaviate's own hybrid query (fused server-side, not leg-cached)"""
+        query_vector = await self._encode_query(query)
+        return await self.backend.hybrid(query, query_vector, alpha, limit, fields, filters)
+
+    async def _cached_leg(
+        self,
+        leg: str,
+        query: str,
+        limit: int,
+        fields: Optional[List[str]],
+        filters: Optional[SearchFilters],
+        fetch: Callable
+    ) -> List[Hit]:
+        """
+        Get one leg's hits from the leg cache or by running fetch
+
+        An entry fetched with a larger limit, or with all properties, also
+        serves smaller or projected requests.
+        """
+        normalized = normalize_query(query)
+        fields_key = tuple(sorted(fields)) if fields is not None else None
+
+        keys = [(normalized, leg, fields_key, filters)]
+        if fields_key is not None:
+            keys.append((normalized, leg, None, filters))
+        for key in keys:
+            cached = self.leg_cache.get(key)
+            if cached is not None and cached[0] >= limit:
+                return cached[1][:limit]
+
+        hits = await fetch(query, limit, fields, filters)
+        self.leg_cache.set(keys[0], (limit, hits))
+        return hits
+
+    async def _vector_leg(
+        self,
+        query: str,
+        limit: int,
+        fields: Optional[List[str]],
+        filters: Optional[SearchFilters]
+    ) -> List[Hit]:
+        """near_vector query"""
+        query_vector = await self._encode_query(query)
+        return await self.backend.near_vector(query_vector, limit, fields, filters)
+
+    async def _keyword_leg(
+        self,
+        query: str,
+        limit: int,
+        fields: Optional[List[str]],
+        filters: Optional[SearchFilters]
+    ) -> List[Hit]:
+        """bm25 query"""
+        return await self.backend.bm25(query, limit, fields, filters)
+
+    @staticmethod
+    async def _no_hits() -> List[Hit]:
+        return []
+
+    def _check_supported(self, mode: SearchMode):
+        """Reject search modes the vector backend can't run"""
+        if mode == SearchMode.KEYWORD and not self.backend.supports_keyword:
+            raise UnsupportedSearchError(
+                f"Keyword search is not supported by the {self.backend.name} backend"
+            )
+
+    def _format_results(self, results: List[Hit], fields: Optional[List[str]] = None) -> List[SearchResult]:
+        """
+        Format search hits to searchresult models
+
+        When fields is given, only those properties were fetched and the
+        others are left as None.
+        """
         formatted_results = []
+        selected = set(fields) if fields else set(SearchResult.PROPERTY_FIELDS)
+
+        for hit in results:
+            props = hit.properties
 
-        for obj in results:
-            props = obj.properties
-
-            # Get score (from distance or score metadata)
-            score = None
-            if hasattr(obj.metadata, 'score') and obj.metadata.score:
-                score = obj.metadata.score
-            elif hasattr(obj.metadata, 'distance') and obj.metadata.distance:
-                # Convert distance to similarity score
-                score = 1 - obj.metadata.distance
-            
             # Create searchresult
             result = SearchResult(
-                title=props.get('title', ''),
-                abstract=props.get('abstract', ''),
-                pmid=props.get('pmid', ''),
-                journal=props.get('journal', ''),
-                year=props.get('year', ''),
-                score=score
+                **{name: props.get(name, '') for name in selected},
+                score=hit.score
             )
 
             formatted_results.append(result)
-        
+
         return formatted_results
-    
-    def get_total_documents(self) -> int:
-        """Get total number of documents in collection"""
+
+    async def search_page(
+        self,
+        query: str,
+        mode: SearchMode = SearchMode.HYBRID,
+        limit: int = 10,
+        alpha: float = settings.DEFAULT_ALPHA,
+        fields: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        fusion: Optional[FusionMethod] = None,
+        filters: Optional[SearchFilters] = None
+    ) -> tuple[list[SearchResult], float, Optional[str]]:
+        """
+        Cursor-based pagination over a cached candidate set
+
+        The first call (no cursor) runs the query once for up to
+        PAGINATION_MAX_CANDIDATES ids and scores - no properties - and keeps
+        them for PAGINATION_CURSOR_TTL seconds. Every page, including the
+        first, then only fetches the properties of its own objects by id, so
+        later pages neither re-encode the query nor re-run the search.
+
+        Args:
+            query, mode, limit, alpha, fields, fusion, filters: As for
+                search(); all but limit and fields are ignored when a cursor
+                is given
+            cursor: Cursor returned with the previous page
+
+        Returns:
+            Tuple of (results list, search time in seconds, next cursor or
+            None on the last page)
+        """
+        if not self.is_ready:
+            raise ServiceNotReadyError(self.startup_error or "Search service is warming up")
+
+        if not cursor:
+            self._check_supported(mode)
+
+        start_time = time.time()
+
+        if cursor:
+            session_id, offset = self._decode_cursor(cursor)
+            candidates = self.page_sessions.get(session_id)
+            if candidates is None:
+                raise InvalidCursorError("Cursor expired or invalid")
+        else:
+            session_id, offset = uuid.uuid4().hex, 0
+            candidates = None
+
         try:
-            response = self.collection.aggregate.over_all(total_count=True)
-            return response.total_count
-        except:
-            return 0
-        
-    def close(self):
-        """Close Weaviate connection"""
-        if self.client:
-            self.client.close()
+            if candidates is None:
+                candidates = await self._fetch_candidates(
+                    query, mode, alpha, fusion or FusionMethod(settings.HYBRID_FUSION), filters
+                )
+                self.page_sessions.set(session_id, candidates)
+
+            page = candidates[offset:offset + limit]
+            results = await self._fetch_page(page, fields)
+        except Exception as e:
+            print(f"Search error: {e}")
+            raise Exception(f"Search failed: {str(e)}")
+
+        next_offset = offset + limit
+        next_cursor = None
+        if next_offset < len(candidates):
+            next_cursor = self._encode_cursor(session_id, next_offset)
+
+        return results, time.time() - start_time, next_cursor
+
+    async def _fetch_candidates(
+        self,
+        query: str,
+        mode: SearchMode,
+        alpha: float,
+        fusion: FusionMethod,
+        filters: Optional[SearchFilters] = None
+    ) -> List[tuple]:
+        """Run the query once for the whole candidate set (ids and scores only)"""
+        limit = settings.PAGINATION_MAX_CANDIDATES
+
+        if mode == SearchMode.SEMANTIC:
+            hits = await self._semantic_search(query, limit, fields=[], filters=filters)
+        elif mode == SearchMode.KEYWORD:
+            hits = await self._keyword_search(query, limit, fields=[], filters=filters)
+        else:
+            hits = await self._hybrid_search(query, limit, alpha, fields=[], fusion=fusion, filters=filters)
 
-# Global instance 
+        return [(hit.uuid, hit.score) for hit in hits]
+
+    async def _fetch_page(self, page: List[tuple], fields: Optional[List[str]]) -> List[SearchResult]:
+        """Fetch the properties of one page of candidates, keeping their order"""
+        if not page:
+            return []
+
+        ids = [object_id for object_id, _ in page]
+        by_id = await self.backend.fetch_properties(ids, fields)
+
+        selected = set(fields) if fields else set(SearchResult.PROPERTY_FIELDS)
+        results = []
+        for object_id, score in page:
+            props = by_id.get(object_id)
+            if props is None:
+                # Deleted since the candidate set was built
+                continue
+            results.append(SearchResult(
+                **{name: props.get(name, '') for name in selected},
+                score=score
+            ))
+        return results
+
+    def _encode_cursor(self, session_id: str, offset: int) -> str:
+        """Build an opaque cursor for a position in a candidate set"""
+        return base64.urlsafe_b64encode(f"{session_id}:{offset}".encode()).decode().rstrip("=")
+
+    def _decode_cursor(self, cursor: str) -> tuple[str, int]:
+        """Parse a cursor built by _encode_cursor"""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            session_id, offset = base64.urlsafe_b64decode(padded).decode().split(":")
+            return session_id, int(offset)
+        except Exception:
+            raise InvalidCursorError("Malformed cursor")
+
+    async def get_total_documents(self) -> Optional[int]:
+        """Get total number of documents in collection (None if it can't be counted)"""
+        try:
+            return await self.backend.count()
+        except Exception as e:
+            print(f"Counting documents failed: {e}")
+            return None
+
+    def get_cache_stats(self) -> dict:
+        """Get hit/miss counters for the search caches"""
+        return {
+            "embedding_cache": self.embedding_cache.stats(),
+            "result_cache": self.result_cache.stats(),
+            "leg_cache": self.leg_cache.stats(),
+            "page_sessions": self.page_sessions.stats(),
+            "index_generation": self.index_generation
+        }
+
+    def get_encoder_stats(self) -> dict:
+        """Get micro-batching metrics for query encoding"""
+        return self.batch_encoder.stats()
+
+    async def close(self):
+        """Close the vector backend and stop the encoder executor"""
+        if self._warmup_task is not None and not self._warmup_task.done():
+            self._warmup_task.cancel()
+        await self.batch_encoder.close()
+        await self.backend.close()
+        self._encode_executor.shutdown(wait=False)
+        self.reranker.close()
+
+def truncate_abstracts(results: List[SearchResult], max_chars: Optional[int]) -> List[SearchResult]:
+    """
+    Shorten abstracts to at most max_chars characters (plus "...")
+
+    Returns copies for truncated results; cached results are never modified.
+    """
+    if not max_chars:
+        return results
+
+    truncated = []
+    for result in results:
+        if result.abstract and len(result.abstract) > max_chars:
+            result = result.model_copy(update={"abstract": result.abstract[:max_chars].rstrip() + "..."})
+        truncated.append(result)
+    return truncated
+
+# Global instance (cheap to create - warm-up starts from the app lifespan)
 search_service = SearchService()
 
 
 
-      
+
 
 
 
@@ -0,0 +1,169 @@
+from typing import Any, Callable, Hashable, List, Optional
+import threading
+import time
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """
+    Answer cache matched by query similarity instead of exact key
+
+    Stores the (normalized) embedding of every answered query in a bounded
+    vector table together with the PMIDs that were sent to the LLM. A new
+    query reuses an answer when its cosine similarity to a stored query and
+    the overlap (Jaccard) of the retrieved papers both reach the configured
+    thresholds, so "covid vaccine adverse effects" can be served by the
+    answer to "side effects of covid vaccines".
+
+    Entries only match lookups with the same scope (e.g. model and number
+    of context papers). The PMIDs are stored in context order, so a caller
+    can map position-based citations of a reused answer onto its own
+    context (see get's adapt argument).
+    """
+
+    def __init__(self, max_size: int, ttl: float, min_similarity: float, min_overlap: float):
+        """
+        Args:
+            max_size: Maximum number of stored answers (0 disables the cache)
+            ttl: Time to live of an entry in seconds (0 means no expiry)
+            min_similarity: Minimum cosine similarity between the queries
+            min_overlap: Minimum Jaccard overlap of the retrieved PMID sets
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.min_similarity = min_similarity
+        self.min_overlap = min_overlap
+
+        self._vectors: Optional[np.ndarray] = None  # (max_size, dim), unit rows
+        self._entries: List[Optional[dict]] = [None] * max_size
+        self._last_used = np.zeros(max_size, dtype=np.float64)
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def get(
+        self,
+        vector: List[float],
+        pmids: List[str],
+        scope: Hashable = None,
+        adapt: Optional[Callable[[Any, List[str]], Optional[Any]]] = None
+    ) -> Optional[Any]:
+        """
+        Return the answer of a similar earlier query, or None
+
+        Args:
+            vector: Query embedding
+            pmids: PMIDs of the current context, in context order
+            scope: Only entries stored with an equal scope match
+            adapt: Called as adapt(value, stored_pmids) for a candidate;
+                returns the value to serve, or None to reject the candidate
+        """
+        if self.max_size <= 0:
+            return None
+
+        query = self._normalize(vector)
+        pmid_set = set(pmids)
+        now = time.monotonic()
+
+        with self._lock:
+            self.lookups += 1
+            if self._vectors is None or query.shape[0] != self._vectors.shape[1]:
+                return None
+
+            similarities = self._vectors @ query
+            # Best matches first; empty slots are zero rows and never pass
+            for slot in np.argsort(-similarities):
+                if similarities[slot] < self.min_similarity:
+                    break
+
+                entry = self._entries[slot]
+                if entry is None:
+                    continue
+                if self.ttl > 0 and now - entry["created_at"] > self.ttl:
+                    self._remove(slot)
+                    continue
+                if entry["scope"] != scope:
+                    continue
+                if self._overlap(pmid_set, set(entry["pmids"])) < self.min_overlap:
+                    continue
+
+                value = entry["value"]
+                if adapt is not None:
+                    value = adapt(value, entry["pmids"])
+                    if value is None:
+                        continue
+
+                self._last_used[slot] = now
+                self.hits += 1
+                return value
+
+        return None
+
+    def set(self, vector: List[float], pmids: List[str], value: Any, scope: Hashable = None) -> None:
+        """Store an answer (pmids in context order), evicting the least recently used entry when full"""
+        if self.max_size <= 0:
+            return
+
+        query = self._normalize(vector)
+        now = time.monotonic()
+
+        with self._lock:
+            if self._vectors is None or query.shape[0] != self._vectors.shape[1]:
+                self._vectors = np.zeros((self.max_size, query.shape[0]), dtype=np.float32)
+                self._entries = [None] * self.max_size
+                self._last_used[:] = 0
+
+            free = [slot for slot, entry in enumerate(self._entries) if entry is None]
+            if free:
+                slot = free[0]
+            else:
+                slot = int(np.argmin(self._last_used))
+                self.evictions += 1
+
+            self._vectors[slot] = query
+            self._entries[slot] = {"pmids": list(pmids), "scope": scope, "value": value, "created_at": now}
+            self._last_used[slot] = now
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)"""
+        with self._lock:
+            self._vectors = None
+            self._entries = [None] * self.max_size
+            self._last_used[:] = 0
+
+    def stats(self) -> dict:
+        """Return size and hit-rate metrics"""
+        with self._lock:
+            return {
+                "size": sum(entry is not None for entry in self._entries),
+                "max_size": self.max_size,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                "min_similarity": self.min_similarity,
+                "min_overlap": self.min_overlap
+            }
+
+    def _remove(self, slot: int) -> None:
+        """Free a slot (caller holds the lock)"""
+        self._vectors[slot] = 0
+        self._entries[slot] = None
+        self._last_used[slot] = 0
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        """Unit-length float32 copy of a vector"""
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    @staticmethod
+    def _overlap(a: set, b: set) -> float:
+        """Jaccard overlap of two PMID sets"""
+        if not a and not b:
+            return 1.0
+        return len(a & b) / len(a | b)
@@ -0,0 +1,331 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import asyncio
+
+from ..config.settings import settings
+from ..models.search import SearchFilters
+from .fusion import Hit
+from .paper_schema import YEAR_INT_PROPERTY
+
+
+class UnsupportedSearchError(ValueError):
+    """Raised for searches the configured vector backend can't run"""
+
+
+class VectorBackend:
+    """
+    Storage and query engine behind SearchService
+
+    Implementations return Hits (uuid, properties, score) so that fusion,
+    caching and formatting in SearchService work the same for every
+    backend. fields=None fetches all properties, [] none.
+    """
+
+    name = "base"
+    # Whether bm25 (and therefore keyword/server-fused hybrid search) works
+    supports_keyword = True
+
+    @property
+    def connected(self) -> bool:
+        """Whether connect() has succeeded"""
+        raise NotImplementedError
+
+    async def connect(self):
+        """Connect / open the index (raises if unavailable)"""
+        raise NotImplementedError
+
+    async def is_ready(self) -> bool:
+        """Live readiness probe"""
+        raise NotImplementedError
+
+    async def near_vector(
+        self,
+        vector: List[float],
+        limit: int,
+        fields: Optional[List[str]] = None,
+        filters: Optional[SearchFilters] = None
+    ) -> List[Hit]:
+        """Vector search; score is the cosine similarity"""
+        raise NotImplementedError
+
+    async def bm25(
+        self,
+        query: str,
+        limit: int,
+        fields: Optional[List[str]] = None,
+        filters: Optional[SearchFilters] = None
+    ) -> List[Hit]:
+        """BM25 keyword search"""
+        raise UnsupportedSearchError(f"Keyword search is not supported by the {self.name} backend")
+
+    async def hybrid(
+        self,
+        query: str,
+        vector: List[float],
+        alpha: float,
+        limit: int,
+        fields: Optional[List[str]] = None,
+        filters: Optional[SearchFilters] = None
+    ) -> List[Hit]:
+        """Server-side fused hybrid search"""
+        raise UnsupportedSearchError(f"Server-side hybrid search is not supported by the {self.name} backend")
+
+    async def fetch_properties(self, ids: List[str], fields: Optional[List[str]] = None) -> Dict[str, dict]:
+        """Properties of objects by id (missing ids are left out)"""
+        raise NotImplementedError
+
+    async def count(self) -> int:
+        """Number of indexed papers"""
+        raise NotImplementedError
+
+    async def index_generation(self) -> Optional[int]:
+        """Current index generation (None if it could not be read)"""
+        raise NotImplementedError
+
+    async def close(self):
+        """Release connections / files"""
+
+
+class WeaviateBackend(VectorBackend):
+    """Weaviate collection via the async v4 client"""
+
+    name = "weaviate"
+
+    def __init__(self, collection_name: str = settings.COLLECTION_NAME):
+        self.collection_name = collection_name
+        self.client = None
+        self.collection = None
+
+    @property
+    def connected(self) -> bool:
+        return self.collection is not None
+
+    async def connect(self):
+        """Connect the async Weaviate client and get the collection"""
+        try:
+            if self.client is None:
+                import weaviate
+
+                self.client = weaviate.use_async_with_local(
+                    host=settings.WEAVIATE_HOST,
+                    port=settings.WEAVIATE_PORT,
+                    grpc_port=settings.WEAVIATE_GRPC_PORT
+                )
+            await self.client.connect()
+
+            # Get Collection
+            self.collection = self.client.collections.get(self.collection_name)
+
+            print("Weaviate connection established successfully.")
+        except Exception as e:
+            print(f"Error connecting to weaviate: {e}")
+            raise
+
+    async def is_ready(self) -> bool:
+        if self.collection is None:
+            return False
+        return await self.client.is_ready()
+
+    async def near_vector(self, vector, limit, fields=None, filters=None) -> List[Hit]:
+        from weaviate.classes.query import MetadataQuery
+
+        response = await self.collection.query.near_vector(
+            near_vector=vector,
+            limit=limit,
+            filters=self._filter(filters),
+            return_properties=fields,
+            return_metadata=MetadataQuery(distance=True)
+        )
+
+        return [self._to_hit(obj) for obj in response.objects]
+
+    async def bm25(self, query, limit, fields=None, filters=None) -> List[Hit]:
+        from weaviate.classes.query import MetadataQuery
+
+        response = await self.collection.query.bm25(
+            query=query,
+            limit=limit,
+            filters=self._filter(filters),
+            return_properties=fields,
+            return_metadata=MetadataQuery(score=True)
+        )
+
+        return [self._to_hit(obj) for obj in response.objects]
+
+    async def hybrid(self, query, vector, alpha, limit, fields=None, filters=None) -> List[Hit]:
+        from weaviate.classes.query import MetadataQuery
+
+        response = await self.collection.query.hybrid(
+            query = query,
+            vector=vector,
+            alpha=alpha,
+            limit=limit,
+            filters=self._filter(filters),
+            return_properties=fields,
+            return_metadata=MetadataQuery(score=True)
+        )
+
+        return [self._to_hit(obj) for obj in response.objects]
+
+    async def fetch_properties(self, ids, fields=None) -> Dict[str, dict]:
+        from weaviate.classes.query import Filter
+
+        response = await self.collection.query.fetch_objects(
+            filters=Filter.by_id().contains_any(ids),
+            limit=len(ids),
+            return_properties=fields
+        )
+        return {str(obj.uuid): obj.properties for obj in response.objects}
+
+    async def count(self) -> int:
+        response = await self.collection.aggregate.over_all(total_count=True)
+        return response.total_count
+
+    async def index_generation(self) -> Optional[int]:
+        from .index_state import fetch_index_generation
+
+        return await fetch_index_generation(self.client, self.collection_name)
+
+    async def close(self):
+        if self.client:
+            await self.client.close()
+
+    @staticmethod
+    def _filter(filters: Optional[SearchFilters]):
+        """
+        Translate search filters to a Weaviate filter (None when unfiltered)
+
+        Years are compared on the range-indexed integer property; the
+        journal must contain all words of the given name.
+        """
+        if filters is None:
+            return None
+
+        from weaviate.classes.query import Filter
+
+        conditions = []
+        if filters.year_from is not None:
+            conditions.append(Filter.by_property(YEAR_INT_PROPERTY).greater_or_equal(filters.year_from))
+        if filters.year_to is not None:
+            conditions.append(Filter.by_property(YEAR_INT_PROPERTY).less_or_equal(filters.year_to))
+        if filters.journal:
+            conditions.append(Filter.by_property("journal").equal(filters.journal))
+
+        if not conditions:
+            return None
+        return Filter.all_of(conditions) if len(conditions) > 1 else conditions[0]
+
+    def _to_hit(self, obj: Any) -> Hit:
+        """Convert a Weaviate object to a Hit"""
+        return Hit(str(obj.uuid), obj.properties, self._get_score(obj))
+
+    def _get_score(self, obj: Any) -> Optional[float]:
+        """Get score (from distance or score metadata)"""
+        # A distance (or score) of 0.0 is a real value - the closest
+        # possible vector hit - so only None means "not returned"
+        if getattr(obj.metadata, 'score', None) is not None:
+            return obj.metadata.score
+        if getattr(obj.metadata, 'distance', None) is not None:
+            # Convert distance to similarity score
+            return 1 - obj.metadata.distance
+        return None
+
+
+class EmbeddedBackend(VectorBackend):
+    """
+    In-process engine over a memory-mapped index (no Weaviate needed)
+
+    Built with python -m src.build_embedded_index. Only vector search is
+    supported: keyword search raises UnsupportedSearchError and hybrid
+    search falls back to the vector leg. Searches run on a small thread
+    pool (numpy releases the GIL during the matrix products). When the
+    index is rebuilt, the new generation is mapped on the next
+    generation check.
+    """
+
+    name = "embedded"
+    supports_keyword = False
+
+    def __init__(self, directory: str, workers: int = 2):
+        """
+        Args:
+            directory: Index directory containing manifest.json
+            workers: Threads running searches
+        """
+        self.directory = directory
+        self.index = None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embedded-index")
+
+    @property
+    def connected(self) -> bool:
+        return self.index is not None
+
+    async def connect(self):
+        """Map the current index generation"""
+        from .embedded_index import EmbeddedIndex
+
+        try:
+            self.index = await self._run(EmbeddedIndex, self.directory)
+            print(f"Embedded index mapped: {len(self.index):,} papers (generation {self.index.generation})")
+        except Exception as e:
+            print(f"Error opening embedded index: {e}")
+            raise
+
+    async def is_ready(self) -> bool:
+        return self.index is not None
+
+    async def near_vector(self, vector, limit, fields=None, filters=None) -> List[Hit]:
+        index = self.index
+
+        def search() -> List[Hit]:
+            return [
+                Hit(index.uuid(row), index.properties(row, fields) if fields != [] else {}, score)
+                for row, score in index.search(vector, limit, filters)
+            ]
+
+        return await self._run(search)
+
+    async def fetch_properties(self, ids, fields=None) -> Dict[str, dict]:
+        index = self.index
+
+        def fetch() -> Dict[str, dict]:
+            return {
+                object_id: index.properties(row, fields)
+                for object_id, row in index.rows_for_ids(ids).items()
+            }
+
+        return await self._run(fetch)
+
+    async def count(self) -> int:
+        return len(self.index) if self.index is not None else 0
+
+    async def index_generation(self) -> Optional[int]:
+        """Manifest generation; a new generation is mapped before returning"""
+        from .embedded_index import read_manifest
+
+        try:
+            manifest = await self._run(read_manifest, self.directory)
+            if manifest is None:
+                return None
+            if self.index is None or manifest["generation"] != self.index.generation:
+                await self.connect()
+            return self.index.generation
+        except Exception as e:
+            print(f"Could not read embedded index generation: {e}")
+            return None
+
+    async def close(self):
+        self._executor.shutdown(wait=False)
+        self.index = None
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+
+def create_backend(name: str = settings.VECTOR_BACKEND) -> VectorBackend:
+    """Vector backend by name (weaviate or embedded)"""
+    if name == "weaviate":
+        return WeaviateBackend()
+    if name == "embedded":
+        return EmbeddedBackend(settings.EMBEDDED_INDEX_DIR, workers=settings.EMBEDDED_SEARCH_WORKERS)
+    raise ValueError(f"Unknown vector backend '{name}' (expected weaviate or embedded)")
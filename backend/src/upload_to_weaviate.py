@@ -1,12 +1,16 @@
+# Run from the backend directory: python -m src.upload_to_weaviate
 import weaviate
-from weaviate.classes.config import Configure, Property, DataType
-from sentence_transformers import SentenceTransformer
 import json
 from tqdm import tqdm
 
+from .config.settings import settings
+from .services.encoders import load_encoder
+from .services.index_state import bump_index_generation
+from .services.paper_schema import paper_properties, paper_uuid, create_paper_collection
+
 # Initialize embedding model
-print("Loading embedding model...")
-model = SentenceTransformer('all-MiniLM-L6-v2')
+print(f"Loading embedding model ({settings.ENCODER_BACKEND} backend)...")
+model = load_encoder()
 
 # Connect to Weaviate (local Docker) 
 with weaviate.connect_to_local() as client:
@@ -19,33 +23,7 @@ def create_schema(client):
         print("Deleted existing collection")
 
     # Define collection configuration
-    client.collections.create(
-        name="MedicalPaper",
-        description="Medical research papers and abstracts",
-        vector_config=Configure.Vectors.self_provided(),  # We provide our own embeddings
-        properties=[
-            Property(
-                name="title", 
-                data_type=DataType.TEXT, 
-                description="Paper title"
-            ),
-            Property(
-                name="abstract", 
-                data_type=DataType.TEXT, 
-                description="Paper abstract content"
-            ),
-            Property(
-                name="pmid", 
-                data_type=DataType.TEXT, 
-                description="PubMed ID"
-            ),
-            Property(
-                name="journal", 
-                data_type=DataType.TEXT, 
-                description="Journal name"
-            ),
-        ]
-    )
+    create_paper_collection(client, "MedicalPaper")
     print("Schema or collection created!")
 
 def upload_papers(client):
@@ -70,13 +48,8 @@ def upload_papers(client):
 
                 # Add to batch
                 batch.add_object(
-                    properties={
-                        "title": paper["title"],
-                        "abstract": paper["abstract"],
-                        "pmid": paper["pmid"],
-                        "journal": paper["journal"],
-                        "year": paper.get("year", "Unkown")
-                    },
+                    uuid=paper_uuid(paper["pmid"]) if paper.get("pmid") else None,
+                    properties=paper_properties(paper),
                     vector=vector
                 )
                 successful_uploads += 1
@@ -97,6 +70,9 @@ if __name__ == "__main__":
         print("\nUploading papers with embeddings...")
         count = upload_papers(client)
 
+        # Collection was recreated - invalidate API result caches
+        bump_index_generation(client, "MedicalPaper")
+
         # Test the upload
         collection = client.collections.get("MedicalPaper")
         result = collection.aggregate.over_all(total_count=True)
@@ -1,182 +1,382 @@
-import weaviate
-from sentence_transformers import SentenceTransformer
+# Run from the backend directory:
+#   python -m src.upload_to_weaviate_v2 [--file FILE] [--overwrite]
+#   python -m src.upload_to_weaviate_v2 --delta [--file FILE] [--retracted FILE] [--prune]
+#
+# Papers are stored under ids derived from their PMID (paper_uuid), so
+# uploads are idempotent upserts: re-running on the same file never creates
+# duplicates, and no scan of the collection is needed at startup.
+#
+# --delta compares the content hashes of every paper in the file with the
+# stored ones and only re-embeds new papers and papers whose title or
+# abstract changed; journal/year changes are re-written in the upload
+# batch with the stored vector. A refresh costs work proportional to the
+# change set. Retracted papers are deleted from a list of PMIDs
+# (--retracted), or - when the file is a full snapshot - by pruning every
+# paper that is not in it (--prune, one cursor pass).
+import argparse
 import json
+
+import weaviate
+from weaviate.classes.query import Filter
 from tqdm import tqdm
-import time
+
+from .config.settings import settings
+from .services.encoders import load_encoder
+from .services.encode_pool import EncodePool
+from .services.index_state import bump_index_generation
+from .services.paper_schema import (
+    CONTENT_HASH_PROPERTY,
+    TEXT_HASH_PROPERTY,
+    content_hash,
+    text_hash,
+    paper_properties,
+    paper_uuid,
+    ensure_year_int_property,
+    ensure_hash_properties,
+    create_paper_collection
+)
+from .services.corpus import iter_papers, batched
+from .services.ingest_pipeline import IngestPipeline
 
 # Configuration
 NEW_DATA_FILE = 'data/medical_papers_100k.json' 
 EXISTING_DATA_FILE = 'medical_papes_large.json'
 BATCH_SIZE = 100
 EMBEDDING_BATCH_SIZE = 32
+# Papers whose ids are looked up in one request
+LOOKUP_BATCH_SIZE = 1000
+# Key of the stored vector carried by papers whose text didn't change, so
+# the encode stage passes it through instead of re-embedding
+STORED_VECTOR_KEY = "_stored_vector"
+# Stored properties that make up the hashes of older objects
+HASHED_PROPERTIES = ["title", "abstract", "journal", "year"]
 
-print("="*70)
-print("Weaviate uploader")
-print("="*70)
+# Set up by setup() - nothing is loaded at import time, because encoder
+# worker processes (ENCODE_PROCESSES) import this module too
+model = None
+encode_pool = None
+client = None
 
-# Initialize embedding model
-print("\n Loading embedding model...")
-model = SentenceTransformer('all-MiniLM-L6-v2')
-print("Model Loaded: all-MiniLM-L6-v2")
+def setup():
+    """Load the embedding model (or start the encoder processes) and connect"""
+    global model, encode_pool, client
 
-print("\n Connecting to weaviate...")
-client = weaviate.connect_to_local()
+    print("="*70)
+    print("Weaviate uploader")
+    print("="*70)
 
-if not client.is_ready():
-    print("Weaviate is not ready")
-    exit(1)
+    if settings.ENCODE_PROCESSES > 0:
+        print(f"\n Starting {settings.ENCODE_PROCESSES} encoder processes...")
+        encode_pool = EncodePool(
+            workers=settings.ENCODE_PROCESSES,
+            torch_threads=settings.ENCODE_TORCH_THREADS,
+            batch_size=EMBEDDING_BATCH_SIZE
+        )
+        print(f"Encoder processes: {encode_pool.workers} x {encode_pool.torch_threads} torch threads")
+    else:
+        # Initialize embedding model
+        print("\n Loading embedding model...")
+        model = load_encoder()
+    print(f"Model: {settings.EMBEDDING_MODEL} ({settings.ENCODER_BACKEND} backend)")
 
-print("Connected to weaviate")
+    print("\n Connecting to weaviate...")
+    client = weaviate.connect_to_local()
 
-def get_existing_pmids():
-    """Get all PMIDs already in weaviate to avoid duplicate"""
-    print("\n Checking existing papers in weaviate...")
+    if not client.is_ready():
+        print("Weaviate is not ready")
+        exit(1)
 
-    try:
-        collection = client.collections.get("MedicalPaper")
-        existing_pmids = set()
-
-        # Fetch all PMIDs in batches
-        offset = 0
-        batch_size = 1000
-
-        with tqdm(desc="Scanning database") as pbar:
-            while True:
-                response = collection.query.fetch_objects(
-                    limit=batch_size,
-                    offset=offset,
-                    return_properties=["pmid"]
-                )
-
-                if not response.objects:
-                    break
-
-                for obj in response.objects:
-                    if obj.properties.get('pmid'):
-                        existing_pmids.add(obj.properties['pmid'])
-                
-                pbar.update(len(response.objects))
-                offset += batch_size
-
-                # Stop if it got less than batch_size (end of data)
-                if len(response.objects) < batch_size:
-                    break
-
-        print(f"Found {len(existing_pmids):,} existing papers in database")
-        return existing_pmids
-    except Exception as e:
-        print(f"Error checking existing papers: {e}")
-        return set()
-    
-def load_papers_from_file(filename):
-    """Load papers from json file"""
-    print(f"\n Loading papers from {filename}...")
+    print("Connected to weaviate")
+
+def existing_paper_ids(collection, uuids):
+    """Return the ids among uuids that already exist in weaviate (one request)"""
+    response = collection.query.fetch_objects(
+        filters=Filter.by_id().contains_any(uuids),
+        limit=len(uuids),
+        return_properties=["pmid"]
+    )
+    return {str(obj.uuid) for obj in response.objects}
+
+def stored_hashes(collection, uuids):
+    """
+    Return {id: (content hash, text hash)} for the ids among uuids that exist in weaviate
+
+    Objects written before the hashes were stored get them computed from
+    their stored properties (one extra request for those only).
+    """
+    response = collection.query.fetch_objects(
+        filters=Filter.by_id().contains_any(uuids),
+        limit=len(uuids),
+        return_properties=[CONTENT_HASH_PROPERTY, TEXT_HASH_PROPERTY]
+    )
+    hashes = {
+        str(obj.uuid): (obj.properties.get(CONTENT_HASH_PROPERTY), obj.properties.get(TEXT_HASH_PROPERTY))
+        for obj in response.objects
+    }
+
+    unhashed = [uuid for uuid, (stored_content, stored_text) in hashes.items() if not (stored_content and stored_text)]
+    if unhashed:
+        response = collection.query.fetch_objects(
+            filters=Filter.by_id().contains_any(unhashed),
+            limit=len(unhashed),
+            return_properties=HASHED_PROPERTIES
+        )
+        for obj in response.objects:
+            hashes[str(obj.uuid)] = (content_hash(obj.properties), text_hash(obj.properties))
+    return hashes
+
+def stored_vectors(collection, uuids):
+    """Return {id: stored vector} for the given ids (one request)"""
+    response = collection.query.fetch_objects(
+        filters=Filter.by_id().contains_any(uuids),
+        limit=len(uuids),
+        include_vector=True,
+        return_properties=["pmid"]
+    )
+    return {
+        str(obj.uuid): obj.vector.get("default") if isinstance(obj.vector, dict) else obj.vector
+        for obj in response.objects
+    }
+
+def load_papers_from_file(filename, counts):
+    """
+    Stream papers from a JSON array or JSONL file
+
+    Papers are parsed one at a time, so memory stays flat and uploading
+    starts right away. counts["read"] is updated as papers are read.
+    """
+    print(f"\n Streaming papers from {filename}...")
 
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            papers = json.load(f)
-        print(f"Loaded {len(papers):,} papers from file")
-        return papers
+        for paper in iter_papers(filename):
+            counts["read"] += 1
+            yield paper
     except FileNotFoundError:
         print(f"File not found: {filename}")
-        return []
+        counts["errors"] += 1
     except Exception as e:
         print(f"Errror loading file: {e}")
-        return []
+        counts["errors"] += 1
     
-def filter_new_papers(papers, existing_pmids):
-    """Filter out papers that already exist in Weaviate"""
-    print(f"\n Filtering for new papers...")
+def filter_new_papers(papers, collection, counts):
+    """
+    Filter out papers that already exist in Weaviate (generator)
+
+    The deterministic ids of LOOKUP_BATCH_SIZE papers are looked up at a
+    time, so the cost depends on the file rather than the collection size.
+    Papers without a PMID have no stable id and are skipped.
+    counts["duplicates"] and counts["no_pmid"] are updated as it goes.
+    """
+    for batch in batched(papers, LOOKUP_BATCH_SIZE):
+        papers_by_id = {}
+        for paper in batch:
+            if not paper.get('pmid'):
+                counts["no_pmid"] += 1
+            elif paper_uuid(paper['pmid']) in papers_by_id:
+                counts["duplicates"] += 1
+            else:
+                papers_by_id[paper_uuid(paper['pmid'])] = paper
 
-    new_papers = []
-    duplicates = 0
+        existing = existing_paper_ids(collection, list(papers_by_id)) if papers_by_id else set()
+        counts["duplicates"] += len(existing)
+        for uuid, paper in papers_by_id.items():
+            if uuid not in existing:
+                yield paper
 
+def changed_papers(papers, collection, counts, seen_ids=None):
+    """
+    Filter out papers whose stored content hash matches (generator)
+
+    Yields new papers and papers whose title or abstract changed - the
+    ones that need a new embedding. Papers where only journal or year
+    changed are yielded with their stored vector (STORED_VECTOR_KEY),
+    which is re-sent through the upload batch instead of re-embedding. Ids are
+    looked up LOOKUP_BATCH_SIZE papers at a time; counts["new"],
+    counts["changed"], counts["metadata_updated"], counts["unchanged"],
+    counts["duplicates"] and counts["no_pmid"] are updated as it goes.
+    counts["completed"] is only set once every paper was looked up.
+
+    Args:
+        seen_ids: Optional set collecting the id of every paper in the file
+    """
+    for batch in batched(papers, LOOKUP_BATCH_SIZE):
+        papers_by_id = {}
+        for paper in batch:
+            if not paper.get('pmid'):
+                counts["no_pmid"] += 1
+                continue
+            uuid = paper_uuid(paper['pmid'])
+            if uuid in papers_by_id:
+                counts["duplicates"] += 1
+            papers_by_id[uuid] = paper
+        if seen_ids is not None:
+            seen_ids.update(papers_by_id)
+
+        stored = stored_hashes(collection, list(papers_by_id)) if papers_by_id else {}
+        to_embed = []
+        metadata_only = []
+        for uuid, paper in papers_by_id.items():
+            properties = paper_properties(paper)
+            if uuid not in stored:
+                counts["new"] += 1
+                to_embed.append(paper)
+            elif stored[uuid][1] != properties[TEXT_HASH_PROPERTY]:
+                counts["changed"] += 1
+                to_embed.append(paper)
+            elif stored[uuid][0] != properties[CONTENT_HASH_PROPERTY]:
+                metadata_only.append(uuid)
+            else:
+                counts["unchanged"] += 1
+
+        # Same text, so the same vector - fetch it once for the whole batch
+        vectors = stored_vectors(collection, metadata_only) if metadata_only else {}
+        for uuid in metadata_only:
+            if vectors.get(uuid) is None:
+                # Deleted since the lookup or stored without a vector
+                counts["changed"] += 1
+                to_embed.append(papers_by_id[uuid])
+            else:
+                counts["metadata_updated"] += 1
+                to_embed.append({**papers_by_id[uuid], STORED_VECTOR_KEY: vectors[uuid]})
+
+        yield from to_embed
+
+    counts["completed"] = True
+
+def read_retracted_pmids(filename):
+    """PMIDs to delete: a JSON array or one PMID per line"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        content = f.read().strip()
+    if content.startswith('['):
+        return [str(pmid) for pmid in json.loads(content)]
+    return [line.strip() for line in content.splitlines() if line.strip()]
+
+def delete_papers(collection, uuids):
+    """Delete papers by id, LOOKUP_BATCH_SIZE ids per request; returns the number deleted"""
+    deleted = 0
+    for chunk in batched(uuids, LOOKUP_BATCH_SIZE):
+        result = collection.data.delete_many(
+            where=Filter.by_id().contains_any(chunk)
+        )
+        deleted += result.successful
+    return deleted
+
+def pruned_paper_ids(collection, keep_ids):
+    """Ids of all papers not in keep_ids (cursor iteration, no offsets)"""
+    return [
+        str(obj.uuid)
+        for obj in tqdm(collection.iterator(return_properties=["pmid"]), desc="Scanning for pruned papers")
+        if str(obj.uuid) not in keep_ids
+    ]
+
+def papers_with_pmid(papers, counts):
+    """Drop papers without a PMID (generator); counts["no_pmid"] is updated"""
     for paper in papers:
-        pmid = paper.get('pmid', '')
-        if pmid and pmid not in existing_pmids:
-            new_papers.append(paper)
+        if paper.get('pmid'):
+            yield paper
         else:
-            duplicates += 1
-    
-    print(f"Found {len(new_papers):,} new papers to upload")
-    print(f"Skipped {duplicates:,} duplicates")
+            counts["no_pmid"] += 1
+
+def encode_papers(batch):
+    """
+    Embed a batch of papers (title + abstract), in sub-batches for memory efficiency
+
+    Papers carrying their stored vector (STORED_VECTOR_KEY) keep it and
+    are not re-encoded.
+    """
+    texts = [f"{paper['title']} {paper['abstract']}" for paper in batch if STORED_VECTOR_KEY not in paper]
+    if not texts:
+        encoded = []
+    elif encode_pool is not None:
+        encoded = encode_pool.encode(texts).tolist()
+    else:
+        encoded = model.encode(texts, batch_size=EMBEDDING_BATCH_SIZE).tolist()
 
-    return new_papers
+    encoded = iter(encoded)
+    return [paper[STORED_VECTOR_KEY] if STORED_VECTOR_KEY in paper else next(encoded) for paper in batch]
 
 def upload_papers_batch(papers):
-    """Upload papers to weaviate with embeddings in batches"""
-    print(f"\n Starting upload of {len(papers):,} papers...")
-    print(f"Batch size: {BATCH_SIZE}")
+    """
+    Upload papers (any iterable) to weaviate with embeddings
+
+    Reading, encoding (INGEST_ENCODE_WORKERS threads, or one per encoder
+    process) and uploading run as a pipeline connected by bounded queues,
+    so the CPU encodes the next batches while the previous ones are being
+    written. Objects are written under paper_uuid(pmid), so a paper that
+    already exists is replaced rather than duplicated.
+
+    Returns:
+        (successful uploads, failed uploads, error) - error is the exception
+        that stopped reading papers early (None when all were read)
+    """
+    encode_workers = settings.ENCODE_PROCESSES or settings.INGEST_ENCODE_WORKERS
+    print(f"\n Starting upload...")
+    print(f"Batch size: {BATCH_SIZE}, encode workers: {encode_workers}")
     print("="*70)
 
-    collection = client.collections.get("MedicalPaper")
+    if not client.collections.exists("MedicalPaper"):
+        # Fresh instance: create the collection with the full schema
+        create_paper_collection(client, "MedicalPaper")
+        print("Created MedicalPaper collection")
+        collection = client.collections.get("MedicalPaper")
+    else:
+        collection = client.collections.get("MedicalPaper")
+        # Collections created before these properties existed need them first
+        if ensure_year_int_property(collection):
+            print("Added year_int property (run python -m src.migrate_year_int to backfill)")
+        if ensure_hash_properties(collection):
+            print("Added content_hash / text_hash properties")
 
-    successful_uploads = 0
-    failed_uploads = 0
+    pipeline = IngestPipeline(
+        encode=encode_papers,
+        encode_workers=encode_workers,
+        batch_size=BATCH_SIZE,
+        queue_size=settings.INGEST_QUEUE_SIZE
+    )
+    rejected = 0
+    error = None
 
-    # Process in batches
-    total_batches = (len(papers) + BATCH_SIZE - 1) // BATCH_SIZE
-    
-    with tqdm(total=len(papers), desc="Uploading papers") as pbar:
-        for batch_idx in range(0, len(papers), BATCH_SIZE):
-            batch = papers[batch_idx:batch_idx + BATCH_SIZE]
-
-            try:
-                # Prepare texts for embedding
-                texts = []
-                for paper in batch:
-                    text = f"{paper['title']} {paper['abstract']}"
-                    texts.append(text)
-
-                # Generate embeddings in sub-batches for memory efficiency 
-                vectors = []
-                for j in range(0, len(texts), EMBEDDING_BATCH_SIZE):
-                    sub_batch = texts[j:j + EMBEDDING_BATCH_SIZE]
-                    sub_vectors = model.encode(sub_batch).tolist()
-                    vectors.extend(sub_vectors)
-                
-                # Prepare objects for weaviate
-                with collection.batch.dynamic() as weaviate_batch:
-                    for paper, vector in zip(batch, vectors):
-                        try:
-                            weaviate_batch.add_object(
-                                properties={
-                                    "title": paper["title"],
-                                    "abstract": paper["abstract"],
-                                    "pmid": paper.get("pmid", ""),
-                                    "journal": paper.get("journal", ""),
-                                    "year": paper.get("year", "Unknown")
-                                },
-                                vector=vector
-                            )
-                            successful_uploads += 1
-                        except Exception as e:
-                            failed_uploads += 1
-                            continue
-                
-                pbar.update(len(batch))
-
-                # Progress report every 10 batches
-                if (batch_idx // BATCH_SIZE + 1) % 10 == 0:
-                    pbar.set_postfix({
-                        'success': successful_uploads,
-                        'failed': failed_uploads
-                    })
-
-            except Exception as e:
-                print(f"\n Batch upload error: {e}")
-                failed_uploads += len(batch)
-                pbar.update(len(batch))
-                time.sleep(1)
-                continue
+    with tqdm(desc="Uploading papers", unit=" papers") as pbar, collection.batch.dynamic() as weaviate_batch:
+        def upload(batch, vectors):
+            nonlocal rejected
+            for paper, vector in zip(batch, vectors):
+                try:
+                    weaviate_batch.add_object(
+                        uuid=paper_uuid(paper['pmid']),
+                        properties=paper_properties(paper),
+                        vector=vector
+                    )
+                except Exception:
+                    rejected += 1
+            pbar.update(len(batch))
+            pbar.set_postfix(pipeline.progress())
+
+        try:
+            stats = pipeline.run(papers, upload)
+        except Exception as e:
+            error = e
+            stats = pipeline.stats()
+
+    # Objects the server rejected are only known once the batch is flushed
+    rejected += len(collection.batch.failed_objects)
+    failed_uploads = rejected + stats["encode"]["failed"] + stats["upload"]["failed"]
+    successful_uploads = stats["upload"]["items"] - rejected
 
     print("\n" + "="*70)
-    print("Upload Complete!!")
+    if error is not None:
+        print(f"Upload INCOMPLETE - reading papers failed: {error}")
+    else:
+        print("Upload Complete!!")
     print(f"Successfully uploaded: {successful_uploads:,}")
     print(f"Failed: {failed_uploads}")
+    print(f"Elapsed: {stats['elapsed']}s")
+    for stage in ("read", "encode", "upload"):
+        print(f"  {stage:>6}: {stats[stage]['docs_per_sec']:>8} docs/s overall, "
+              f"{stats[stage]['busy_docs_per_sec']:>8} docs/s when busy, "
+              f"utilization {stats[stage]['utilization']:.0%}")
     print("="*70)
 
-    return successful_uploads, failed_uploads
+    return successful_uploads, failed_uploads, error
 
 def verify_upload():
     """Verify final count in Weaviate"""
@@ -193,48 +393,141 @@ def verify_upload():
         print(f"Error verifying: {e}")
         return 0
     
-def main():
-    """Main execution flow"""
-    
-    # Step 1: Get existing PMIDs from Weaviate
-    existing_pmids = get_existing_pmids()
-    
-    # Step 2: Load new papers from file
-    papers = load_papers_from_file(NEW_DATA_FILE)
-    
-    if not papers:
+def main(filename=NEW_DATA_FILE, overwrite=False):
+    """
+    Main execution flow
+
+    Args:
+        filename: Collected papers JSON / JSONL file
+        overwrite: Re-embed and upsert papers that already exist instead of
+            skipping them (e.g. after changing the embedding model)
+    """
+    collection = client.collections.get("MedicalPaper")
+
+    # Stream papers from the file, skip existing ones (batched id lookups)
+    # and upload the rest - all lazily, one batch at a time
+    counts = {"read": 0, "duplicates": 0, "no_pmid": 0, "errors": 0}
+    papers = load_papers_from_file(filename, counts)
+    if overwrite:
+        new_papers = papers_with_pmid(papers, counts)
+    else:
+        new_papers = filter_new_papers(papers, collection, counts)
+    successful, failed, error = upload_papers_batch(new_papers)
+
+    if counts["read"] == 0:
         print("\n No papers to upload")
         return
-    
-    # Step 3: Filter out duplicates
-    new_papers = filter_new_papers(papers, existing_pmids)
-    
-    if not new_papers:
+    if successful + failed == 0 and error is None:
         print("\n All papers already in database!")
-        verify_upload()
-        return
-    
-    # Step 4: Upload new papers
-    successful, failed = upload_papers_batch(new_papers)
+
+    # Invalidate API result caches
+    if successful:
+        generation = bump_index_generation(client, "MedicalPaper")
+        print(f"Index generation bumped to {generation}")
     
-    # Step 5: Verify final count
+    # Verify final count
     final_count = verify_upload()
     
     # Summary
     print("\n" + "="*70)
     print("FINAL SUMMARY")
     print("="*70)
-    print(f"Papers in file: {len(papers):,}")
-    print(f"Duplicates skipped: {len(papers) - len(new_papers):,}")
-    print(f"New papers uploaded: {successful:,}")
+    print(f"Papers in file: {counts['read']:,}")
+    print(f"Already in database (skipped): {counts['duplicates']:,}")
+    print(f"Without PMID (skipped): {counts['no_pmid']:,}")
+    print(f"Papers {'upserted' if overwrite else 'uploaded'}: {successful:,}")
+    print(f"Upload failures: {failed}")
+    if error is not None:
+        print(f"Stopped early: {error}")
+    print(f"Total in database: {final_count:,}")
+    print("="*70)
+
+def delta_sync(filename=NEW_DATA_FILE, retracted_file=None, prune=False):
+    """
+    Delta sync: upsert new and changed papers, delete retracted ones
+
+    Args:
+        filename: Collected papers JSON / JSONL file
+        retracted_file: Optional file of PMIDs to delete
+        prune: Treat the file as a full snapshot and delete every paper
+            that is not in it
+    """
+    collection = client.collections.get("MedicalPaper")
+
+    counts = {
+        "read": 0, "new": 0, "changed": 0, "metadata_updated": 0, "unchanged": 0,
+        "duplicates": 0, "no_pmid": 0, "errors": 0, "completed": False
+    }
+    seen_ids = set() if prune else None
+    papers = load_papers_from_file(filename, counts)
+    successful, failed, error = upload_papers_batch(changed_papers(papers, collection, counts, seen_ids))
+
+    to_delete = []
+    if retracted_file:
+        to_delete += [paper_uuid(pmid) for pmid in read_retracted_pmids(retracted_file)]
+    if prune:
+        # seen_ids of a partly read or partly looked up snapshot is
+        # incomplete, and pruning would delete papers that still exist
+        if error is not None or counts["errors"] or not counts["completed"] or counts["read"] == 0:
+            print("\n Not pruning: the papers file could not be read and checked completely")
+        else:
+            to_delete += pruned_paper_ids(collection, seen_ids)
+
+    deleted = delete_papers(collection, to_delete) if to_delete else 0
+
+    # Invalidate API result caches
+    if successful or deleted:
+        generation = bump_index_generation(client, "MedicalPaper")
+        print(f"Index generation bumped to {generation}")
+
+    final_count = verify_upload()
+
+    print("\n" + "="*70)
+    print("DELTA SYNC SUMMARY")
+    print("="*70)
+    print(f"Papers in file: {counts['read']:,}")
+    print(f"Unchanged (skipped): {counts['unchanged']:,}")
+    print(f"New: {counts['new']:,}  text changed: {counts['changed']:,}")
+    print(f"Metadata only changed (stored vector reused): {counts['metadata_updated']:,}")
+    print(f"Without PMID (skipped): {counts['no_pmid']:,}")
+    print(f"Papers upserted: {successful:,}")
     print(f"Upload failures: {failed}")
+    if error is not None:
+        print(f"Stopped early: {error}")
+    print(f"Papers deleted: {deleted:,}")
     print(f"Total in database: {final_count:,}")
     print("="*70)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Upload collected papers to Weaviate")
+    parser.add_argument("--file", default=NEW_DATA_FILE, help="Collected papers JSON / JSONL file")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Re-embed and upsert papers that already exist")
+    parser.add_argument("--delta", action="store_true",
+                        help="Only re-embed new and changed papers (content hash comparison)")
+    parser.add_argument("--retracted", help="With --delta: file of PMIDs to delete (JSON array or one per line)")
+    parser.add_argument("--prune", action="store_true",
+                        help="With --delta: delete papers that are not in the file (full snapshot)")
+    args = parser.parse_args()
+
+    if (args.retracted or args.prune) and not args.delta:
+        parser.error("--retracted and --prune require --delta")
+    if args.delta and args.overwrite:
+        parser.error("--delta and --overwrite are mutually exclusive")
+    return args
+
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        main()
+        setup()
+        if args.delta:
+            delta_sync(args.file, args.retracted, args.prune)
+        else:
+            main(args.file, args.overwrite)
     finally:
-        print("\n Closing Weaviate connection...")
-        client.close()
+        if encode_pool is not None:
+            encode_pool.close()
+        if client is not None:
+            print("\n Closing Weaviate connection...")
+            client.close()
         print("Done!")
\ No newline at end of file